@@ -0,0 +1,82 @@
+"""
+Negotiated compression of dynamic responses.
+
+CompressionMiddleware is GZipMiddleware with brotli: a client that accepts
+"br" gets brotli (when the brotli package is installed), otherwise gzip, and
+bodies under RESPONSE_COMPRESSION_MIN_SIZE bytes are sent as they are, since
+the headers would cost more than compression saves. HTML and responses that
+set the CSRF cookie always get gzip, for its BREACH padding. Files answered by
+FileServingMiddleware never get here; they are pre-compressed at collectstatic
+time instead.
+"""
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from .fileserving import _accepted_encodings, brotli
+
+# Already compressed; another pass only costs CPU.
+INCOMPRESSIBLE_TYPES = ('image/', 'video/', 'audio/', 'application/zip', 'application/gzip', 'application/pdf')
+
+
+def _secret_bearing(response):
+    # HTML can echo request data next to a CSRF token. GZipMiddleware pads
+    # such bodies with random-length data against BREACH; brotli here would not.
+    return response.get('Content-Type', '').startswith('text/html') or settings.CSRF_COOKIE_NAME in response.cookies
+
+
+def _brotli_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for item in sequence:
+        data = compressor.process(item)
+        # Flush each chunk so streamed exports keep reaching the client as they are produced.
+        data += compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def _brotli_sequence_async(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    async for item in sequence:
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Brotli or gzip by Accept-Encoding, above a size threshold (see the module docstring)."""
+
+    def process_response(self, request, response):
+        if (
+            response.has_header('Content-Encoding')
+            or response.status_code in (204, 304)
+            or response.get('Content-Type', '').startswith(INCOMPRESSIBLE_TYPES)
+            or not response.streaming and len(response.content) < settings.RESPONSE_COMPRESSION_MIN_SIZE
+        ):
+            return response
+        if brotli is None or 'br' not in _accepted_encodings(request) or _secret_bearing(response):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        quality = settings.RESPONSE_BROTLI_QUALITY
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _brotli_sequence_async(response.streaming_content, quality)
+            else:
+                response.streaming_content = _brotli_sequence(response.streaming_content, quality)
+            del response.headers['Content-Length']
+        else:
+            compressed = brotli.compress(response.content, quality=quality)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The body changed, so a strong ETag no longer identifies it (RFC 9110 8.8.1).
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
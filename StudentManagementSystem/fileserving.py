@@ -0,0 +1,214 @@
+"""
+Static and media file serving for deployments without a web server in front.
+
+CompressedManifestStaticFilesStorage writes content-hashed copies of every
+static file at collectstatic time, plus pre-compressed .gz siblings (and .br,
+when the brotli package is installed). FileServingMiddleware answers requests
+under STATIC_URL and MEDIA_URL before the rest of the middleware stack runs:
+
+- hashed static names get a year-long immutable Cache-Control; everything
+  else is revalidated with ETag / Last-Modified and gets 304 Not Modified;
+- the pre-compressed variant matching Accept-Encoding is served as is;
+- a single byte range gets 206 Partial Content (resumable downloads, seeking);
+- media can be handed to the front server with X-Accel-Redirect or X-Sendfile
+  (MEDIA_SENDFILE) instead of being streamed by a Python worker.
+"""
+import gzip
+import mimetypes
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.mjs', '.json', '.map', '.svg', '.txt', '.html', '.xml', '.ico', '.ttf', '.otf', '.eot',
+}
+# Preferred first.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE = 'public, max-age=31536000, immutable'
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _compressors():
+    yield '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', brotli.compress
+
+
+def compress_file(path):
+    """Write .gz/.br siblings of `path`, keeping only those that save at least 5%."""
+    path = Path(path)
+    data = path.read_bytes()
+    if len(data) < 256:
+        return
+    for suffix, compress in _compressors():
+        compressed = compress(data)
+        if len(compressed) < len(data) * 0.95:
+            path.with_name(path.name + suffix).write_bytes(compressed)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in {*paths, *self.hashed_files.values()}:
+            if Path(name).suffix.lower() in COMPRESSIBLE_EXTENSIONS and self.exists(name):
+                compress_file(self.path(name))
+
+
+def _accepted_encodings(request):
+    """Content codings in Accept-Encoding with a non-zero q-value; those with a malformed one are left out."""
+    accepted = set()
+    for token in request.headers.get('Accept-Encoding', '').split(','):
+        coding, *params = token.split(';')
+        quality = '1'
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                quality = value.strip()
+        try:
+            if float(quality) > 0 and coding.strip():
+                accepted.add(coding.strip().lower())
+        except ValueError:
+            pass
+    return accepted
+
+
+def _byte_range(request, size, etag, last_modified):
+    """(start, end) of a satisfiable single Range, None to send everything, or False if unsatisfiable."""
+    match = RANGE.match(request.headers.get('Range', ''))
+    if not match or not any(match.groups()):
+        return None
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range not in (etag, last_modified):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(file, start, length, chunk_size=64 * 1024):
+    with file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+class FileServingMiddleware:
+    """Serves STATIC_ROOT (SERVE_STATIC) and MEDIA_ROOT (SERVE_MEDIA), see the module docstring."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.roots = []
+        if settings.SERVE_STATIC:
+            self.roots.append((settings.STATIC_URL, Path(settings.STATIC_ROOT), True))
+        if settings.SERVE_MEDIA:
+            self.roots.append((settings.MEDIA_URL, Path(settings.MEDIA_ROOT), False))
+        if not self.roots:
+            raise MiddlewareNotUsed
+        # Names collectstatic content-hashed; they never change, so clients may cache them forever.
+        self.immutable = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD'):
+            for prefix, root, static in self.roots:
+                if request.path_info.startswith(prefix):
+                    response = self.serve(request, root, request.path_info[len(prefix):], static)
+                    if response is not None:
+                        return response
+        return self.get_response(request)
+
+    def serve(self, request, root, name, static):
+        try:
+            path = Path(safe_join(root, name))
+        except (SuspiciousFileOperation, ValueError):
+            return None
+        if not name or not path.is_file():
+            return None
+
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        compressible = path.suffix.lower() in COMPRESSIBLE_EXTENSIONS
+        variant, encoding = path, None
+        if compressible and 'Range' not in request.headers:
+            accepted = _accepted_encodings(request)
+            for candidate_encoding, suffix in ENCODINGS:
+                candidate = path.with_name(path.name + suffix)
+                if candidate_encoding in accepted and candidate.is_file():
+                    variant, encoding = candidate, candidate_encoding
+                    break
+
+        stat = variant.stat()
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        last_modified = http_date(stat.st_mtime)
+        headers = {
+            'Cache-Control': IMMUTABLE if static and name in self.immutable else
+            f'public, max-age={settings.STATIC_MAX_AGE if static else settings.MEDIA_MAX_AGE}',
+            'ETag': etag,
+            'Last-Modified': last_modified,
+            'Accept-Ranges': 'bytes',
+        }
+        if compressible:
+            headers['Vary'] = 'Accept-Encoding'
+        if encoding:
+            headers['Content-Encoding'] = encoding
+
+        response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+        if response is None and not static and settings.MEDIA_SENDFILE:
+            response = self.sendfile(path, name, content_type)
+        if response is None:
+            response = self.file_response(request, variant, path.name, stat.st_size, content_type, etag, last_modified)
+        for header, value in headers.items():
+            response.headers.setdefault(header, value)
+        return response
+
+    def file_response(self, request, path, filename, size, content_type, etag, last_modified):
+        byte_range = _byte_range(request, size, etag, last_modified)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range is not None:
+            start, end = byte_range
+            length = end - start + 1
+            body = [] if request.method == 'HEAD' else _read_range(path.open('rb'), start, length)
+            response = StreamingHttpResponse(body, status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(length)
+            return response
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=content_type)
+            response['Content-Length'] = str(size)
+            return response
+        # FileResponse lets the WSGI server use os.sendfile() through wsgi.file_wrapper.
+        return FileResponse(path.open('rb'), filename=filename, content_type=content_type)
+
+    def sendfile(self, path, name, content_type):
+        response = HttpResponse(content_type=content_type)
+        if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(name)
+        else:
+            response['X-Sendfile'] = str(path)
+        return response
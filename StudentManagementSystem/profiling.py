@@ -0,0 +1,184 @@
+"""
+Opt-in request profiling.
+
+When PROFILING_ENABLED is set, ProfilingMiddleware records wall time, query
+count, DB time, serializer time and response size for every request, tagged by
+router basename and viewset action, and appends one JSON line per request to
+PROFILING_LOG. Requests over PROFILING_SLOW_MS or PROFILING_MAX_QUERIES are
+flagged and keep their captured SQL. The log is shared by every worker process;
+`profiling_report()` and the `profiling_report` management command aggregate it.
+Once the log reaches PROFILING_LOG_MAX_BYTES it is moved to PROFILING_LOG.1,
+replacing the previous one, and reports read only the last PROFILING_MAX_SAMPLES.
+"""
+import json
+import logging
+import math
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_profile', default=None)
+_write_lock = threading.Lock()
+
+
+class RequestProfile:
+    def __init__(self):
+        self.queries = []
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.db_time += elapsed
+            self.queries.append((sql, elapsed))
+
+
+def timed_serializer():
+    """Context manager accumulating serializer time on the current request, if profiled."""
+    profile = _current.get()
+    return _serializer_timer(profile) if profile is not None else nullcontext()
+
+
+@contextmanager
+def _serializer_timer(profile):
+    # Only the outermost serializer counts, so nested serializers aren't double counted.
+    profile.serializer_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.serializer_depth -= 1
+        if not profile.serializer_depth:
+            profile.serializer_time += time.perf_counter() - start
+
+
+def _view_tags(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None, None
+    initkwargs = getattr(match.func, 'initkwargs', {})
+    actions = getattr(match.func, 'actions', None) or {}
+    return (
+        initkwargs.get('basename') or match.view_name,
+        actions.get(request.method.lower(), request.method.lower()),
+    )
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = settings.PROFILING_SLOW_MS
+        self.max_queries = settings.PROFILING_MAX_QUERIES
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        basename, action = _view_tags(request)
+        sample = {
+            'time': time.time(),
+            'method': request.method,
+            'path': request.path,
+            'basename': basename,
+            'action': action,
+            'status': response.status_code,
+            'wall_ms': round(wall_ms, 3),
+            'queries': len(profile.queries),
+            'db_ms': round(profile.db_time * 1000, 3),
+            'serializer_ms': round(profile.serializer_time * 1000, 3),
+            'bytes': None if response.streaming else len(response.content),
+        }
+        if wall_ms > self.slow_ms or len(profile.queries) > self.max_queries:
+            sample['slow'] = True
+            sample['sql'] = [{'sql': sql, 'ms': round(elapsed * 1000, 3)} for sql, elapsed in profile.queries]
+            logger.warning(
+                'Slow request %s %s: %.1f ms, %d queries', request.method, request.path, wall_ms, len(profile.queries)
+            )
+        _write_sample(sample)
+        return response
+
+
+def _write_sample(sample):
+    line = json.dumps(sample, separators=(',', ':'))
+    with _write_lock:
+        with open(settings.PROFILING_LOG, 'a', encoding='utf-8') as log:
+            log.write(line + '\n')
+            full = log.tell() >= settings.PROFILING_LOG_MAX_BYTES
+        if full:
+            # Another worker may rotate at the same moment; losing a few samples then is fine.
+            try:
+                os.replace(settings.PROFILING_LOG, f'{settings.PROFILING_LOG}.1')
+            except FileNotFoundError:
+                pass
+
+
+def load_samples(path=None, limit=None):
+    """The last `limit` (default PROFILING_MAX_SAMPLES) samples in the log."""
+    limit = settings.PROFILING_MAX_SAMPLES if limit is None else limit
+    try:
+        with open(path or settings.PROFILING_LOG, encoding='utf-8') as log:
+            return [json.loads(line) for line in deque((line for line in log if line.strip()), maxlen=limit)]
+    except FileNotFoundError:
+        return []
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+def profiling_report(samples=None, slowest=20):
+    """Aggregate samples into per-endpoint percentiles plus the slowest flagged requests."""
+    samples = load_samples() if samples is None else samples
+    groups = {}
+    for sample in samples:
+        groups.setdefault((sample['basename'], sample['action']), []).append(sample)
+
+    endpoints = []
+    for (basename, action), group in groups.items():
+        wall = [sample['wall_ms'] for sample in group]
+        queries = [sample['queries'] for sample in group]
+        sizes = [sample['bytes'] for sample in group if sample['bytes'] is not None]
+        endpoints.append({
+            'basename': basename,
+            'action': action,
+            'count': len(group),
+            'wall_ms_p50': _percentile(wall, 50),
+            'wall_ms_p95': _percentile(wall, 95),
+            'wall_ms_p99': _percentile(wall, 99),
+            'queries_mean': round(statistics.fmean(queries), 2),
+            'queries_max': max(queries),
+            'db_ms_mean': round(statistics.fmean(sample['db_ms'] for sample in group), 3),
+            'serializer_ms_mean': round(statistics.fmean(sample['serializer_ms'] for sample in group), 3),
+            'bytes_mean': round(statistics.fmean(sizes)) if sizes else None,
+        })
+    endpoints.sort(key=lambda endpoint: endpoint['wall_ms_p95'], reverse=True)
+
+    slow = sorted((sample for sample in samples if sample.get('slow')), key=lambda sample: -sample['wall_ms'])
+    return {'endpoints': endpoints, 'slow_requests': slow[:slowest]}
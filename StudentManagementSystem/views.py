@@ -0,0 +1,11 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from .profiling import profiling_report
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profiling(request):
+    return Response(profiling_report())
@@ -0,0 +1,108 @@
+"""
+JWT authentication that trusts the token's claims on reads.
+
+Access tokens carry the user's username, email and staff flags (see
+accounts.serializers), so safe requests are authenticated from the signed
+claims alone, as a TokenUser, without loading the User row. Unsafe requests
+get a real User, served from a short-lived in-process cache.
+
+Saving or deleting a user revokes every token issued to them before the change
+(accounts.signals). The revocation is stored in the database (TokenRevocation),
+which unsafe requests and token refreshes check, and in AUTH_REVOCATION_CACHE,
+which is all that stateless reads check: unless that cache is shared between
+workers, other workers keep accepting reads with a revoked access token until
+it expires (see accounts.checks).
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import TokenRevocation
+
+_users = {}
+_users_lock = threading.Lock()
+
+
+def _revocation_key(user_id):
+    return f'auth:revoked:{user_id}'
+
+
+def revoke_tokens(user_id):
+    """Reject every token issued to `user_id` until now and drop the user from this process's cache."""
+    now = timezone.now()
+    TokenRevocation.objects.update_or_create(user_id=str(user_id), defaults={'revoked_at': now})
+    timeout = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME).total_seconds()
+    caches[settings.AUTH_REVOCATION_CACHE].set(_revocation_key(user_id), now.timestamp(), timeout)
+    with _users_lock:
+        _users.pop(str(user_id), None)
+
+
+def is_revoked(token, durable=False):
+    """
+    Whether `token` was issued before its user's last revocation, as recorded
+    in the revocation cache, and also in the database if `durable`.
+    """
+    # "iat" is whole seconds, so a token minted in the same second as a
+    # revocation is rejected too; that errs on the safe side.
+    user_id = token[api_settings.USER_ID_CLAIM]
+    revoked_at = caches[settings.AUTH_REVOCATION_CACHE].get(_revocation_key(user_id))
+    if durable:
+        stored = TokenRevocation.objects.filter(user_id=str(user_id)).values_list('revoked_at', flat=True).first()
+        if stored is not None:
+            revoked_at = max(revoked_at or 0, stored.timestamp())
+    return revoked_at is not None and token.get('iat', 0) < revoked_at
+
+
+def cached_user(user_id):
+    """The User for `user_id`, loaded at most once per AUTH_USER_CACHE_TTL seconds in this process."""
+    key = str(user_id)
+    now = time.monotonic()
+    with _users_lock:
+        expires, user = _users.get(key, (0, None))
+    if expires > now:
+        return user
+    user = get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+    with _users_lock:
+        if len(_users) >= settings.AUTH_USER_CACHE_SIZE:
+            _users.clear()
+        _users[key] = (now + settings.AUTH_USER_CACHE_TTL, user)
+    return user
+
+
+def clear_user_cache():
+    with _users_lock:
+        _users.clear()
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that authenticates safe requests from the token's claims
+    (a TokenUser, no query) and unsafe ones against the cached User.
+    """
+
+    def authenticate(self, request):
+        self.stateless = settings.JWT_STATELESS_READS and request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('Token contained no recognizable user identification')
+        if is_revoked(validated_token, durable=not self.stateless):
+            raise InvalidToken('Token has been revoked')
+        if self.stateless:
+            return api_settings.TOKEN_USER_CLASS(validated_token)
+
+        user = cached_user(validated_token[api_settings.USER_ID_CLAIM])
+        if user is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Backends whose entries only the process that wrote them can see.
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.security, Tags.caches, deploy=True)
+def check_revocation_cache(app_configs, **kwargs):
+    """Stateless reads only see revocations through AUTH_REVOCATION_CACHE, so it must be shared."""
+    backend = settings.CACHES[settings.AUTH_REVOCATION_CACHE]['BACKEND']
+    if settings.JWT_STATELESS_READS and backend in LOCAL_CACHE_BACKENDS:
+        return [Warning(
+            f'AUTH_REVOCATION_CACHE uses {backend}, which is not shared between worker processes.',
+            hint='Set AUTH_CACHE_BACKEND and AUTH_CACHE_LOCATION to a shared cache such as Redis or '
+                 'Memcached, or JWT_STATELESS_READS=false; otherwise reads keep accepting revoked access '
+                 'tokens in other workers until they expire.',
+            id='accounts.W001',
+        )]
+    return []
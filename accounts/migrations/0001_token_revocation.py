@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenRevocation',
+            fields=[
+                ('user_id', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('revoked_at', models.DateTimeField()),
+            ],
+        ),
+    ]
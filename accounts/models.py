@@ -1,3 +1,14 @@
 from django.db import models
 
-# Create your models here.
+
+class TokenRevocation(models.Model):
+    """
+    Tokens issued to `user_id` before `revoked_at` are no longer valid (see
+    accounts.authentication). Keyed by the id rather than a foreign key so the
+    record outlives a deleted user.
+    """
+    user_id = models.CharField(max_length=64, primary_key=True)
+    revoked_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user_id}: tokens before {self.revoked_at}"
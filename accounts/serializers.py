@@ -1,5 +1,18 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+
+from .authentication import is_revoked
+
+# Copied into every token, so read requests can be authenticated without a query.
+USER_CLAIMS = ('username', 'email', 'is_staff', 'is_superuser')
+
+
+def add_user_claims(token, user):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -16,3 +29,22 @@ class RegisterSerializer(serializers.ModelSerializer):
             password=validated_data['password']
         )
         return user
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refuses refresh tokens issued before their user's last revocation. The new
+    access token copies the refresh token's claims, which are current because
+    any change to the user revokes it; the refresh token is not rotated.
+    """
+
+    def validate(self, attrs):
+        if is_revoked(self.token_class(attrs['refresh']), durable=True):
+            raise InvalidToken('Token has been revoked')
+        return super().validate(attrs)
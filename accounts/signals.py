@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import revoke_tokens
+
+
+@receiver(post_save, sender=get_user_model(), dispatch_uid='revoke_tokens_user_save')
+def revoke_changed_user(sender, instance, created, update_fields=None, **kwargs):
+    # Tokens embed the user's claims, so any change invalidates them; logins
+    # that only touch last_login don't.
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    revoke_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=get_user_model(), dispatch_uid='revoke_tokens_user_delete')
+def revoke_deleted_user(sender, instance, **kwargs):
+    revoke_tokens(instance.pk)
@@ -1,3 +1,73 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from app.models import Course
+
+from .authentication import clear_user_cache
+
+
+class ClaimsAuthenticationTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        caches['auth'].clear()
+        clear_user_cache()
+        self.user = User.objects.create_user('teacher', 'teacher@example.com', 'correct horse')
+        self.client = APIClient()
+        response = self.client.post('/api/accounts/login/', {'username': 'teacher', 'password': 'correct horse'})
+        self.tokens = response.json()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.tokens["access"]}')
+
+    def _user_queries(self, context):
+        return [query for query in context.captured_queries if '"auth_user"' in query['sql']]
+
+    def test_reads_use_claims(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/accounts/me/')
+        self.assertEqual(response.json(), {'id': self.user.pk, 'username': 'teacher', 'email': 'teacher@example.com'})
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get('/api/courses/').status_code, 200)
+        self.assertEqual(self._user_queries(context), [])
+
+    def test_writes_use_cached_user(self):
+        with CaptureQueriesContext(connection) as context:
+            for i in range(3):
+                self.client.post('/api/courses/', {'name': f'Course {i}', 'code': f'C{i}'}, format='json')
+        self.assertEqual(Course.objects.count(), 3)
+        self.assertEqual(len(self._user_queries(context)), 1)
+
+    def test_batch_shares_authentication(self):
+        operations = [{'method': 'POST', 'path': '/api/courses/', 'body': {'name': f'Course {i}', 'code': f'C{i}'}}
+                      for i in range(3)]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post('/api/batch/', {'operations': operations}, format='json')
+        self.assertEqual([result['status'] for result in response.json()['results']], [201] * 3)
+        self.assertEqual(len(self._user_queries(context)), 1)
+
+    def test_change_revokes_tokens(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/accounts/me/').status_code, 401)
+        response = self.client.post('/api/accounts/token/refresh/', {'refresh': self.tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
+
+    def test_revocation_outlives_the_cache(self):
+        # As in a worker that never saw the revocation in its local cache.
+        self.user.email = 'teacher@school.example.com'
+        self.user.save()
+        caches['auth'].clear()
+        clear_user_cache()
+        response = self.client.post('/api/courses/', {'name': 'Course', 'code': 'C'}, format='json')
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post('/api/accounts/token/refresh/', {'refresh': self.tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Course.objects.exists())
+
+    def test_refresh_keeps_claims(self):
+        access = self.client.post('/api/accounts/token/refresh/', {'refresh': self.tokens['refresh']}).json()['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.get('/api/accounts/me/').json()['email'], 'teacher@example.com')
@@ -1,18 +1,159 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connection
+from django.utils.functional import cached_property
 
 from app.models import Student, Course, YearLevel, Section, Subject, Quiz, Exam, Activity, QuizResult, \
-    ExamResult, ActivityResult
-
-# Register your models here.
-
-admin.site.register(Student)
-admin.site.register(Course)
-admin.site.register(YearLevel)
-admin.site.register(Section)
-admin.site.register(Subject)
-admin.site.register(Quiz)
-admin.site.register(Exam)
-admin.site.register(Activity)
-admin.site.register(QuizResult)
-admin.site.register(ExamResult)
-admin.site.register(ActivityResult)
+    ExamResult, ActivityResult, StudentSubjectGrade, Promotion, ReportJob, assessment_field, display_relations
+
+
+def estimated_count(model):
+    """
+    Row count of `model`'s table from the planner statistics, or None if there
+    are none (PostgreSQL before the first ANALYZE; SQLite until ANALYZE or
+    PRAGMA optimize has filled sqlite_stat1).
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        try:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)', [table])
+            elif connection.vendor == 'sqlite':
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            else:
+                return None
+        except DatabaseError:
+            return None
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    count = int(str(row[0]).split()[0])
+    return count if count >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts an unfiltered changelist from the table statistics once the table is
+    large, instead of a COUNT(*) over every row on each page load.
+    """
+    threshold = 10000
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimate = estimated_count(self.object_list.model)
+            if estimate is not None and estimate >= self.threshold:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelists join what `__str__` reads (see display_relations) and never
+    count the whole table just to show "N total".
+    """
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def get_list_select_related(self, request):
+        return self.list_select_related or display_relations(self.model)
+
+
+@admin.register(Course)
+class CourseAdmin(admin.ModelAdmin):
+    list_display = ('name', 'code')
+    search_fields = ('name', 'code')
+
+
+@admin.register(YearLevel)
+class YearLevelAdmin(admin.ModelAdmin):
+    list_display = ('year',)
+    search_fields = ('year',)
+
+
+@admin.register(Section)
+class SectionAdmin(admin.ModelAdmin):
+    list_display = ('section',)
+    search_fields = ('section',)
+
+
+@admin.register(Subject)
+class SubjectAdmin(LargeTableAdmin):
+    list_display = ('name', 'code', 'course')
+    list_filter = ('course',)
+    search_fields = ('name', 'code')
+    autocomplete_fields = ('course',)
+
+
+@admin.register(Student)
+class StudentAdmin(LargeTableAdmin):
+    list_display = ('last_name', 'first_name', 'student_id', 'email', 'course', 'year_level', 'section')
+    list_select_related = ('course', 'year_level', 'section')
+    list_filter = ('course', 'year_level', 'section')
+    search_fields = ('^last_name', '^first_name', '^email', '=student_id')
+    autocomplete_fields = ('course', 'year_level', 'section', 'subject')
+    readonly_fields = ('profile_thumbnails',)
+
+
+class AssessmentAdmin(LargeTableAdmin):
+    list_display = ('title', 'subject', 'total_marks', 'created_at')
+    list_filter = ('subject__course',)
+    search_fields = ('title',)
+    autocomplete_fields = ('subject',)
+
+
+def result_admin(result_model):
+    field = assessment_field(result_model).name
+    return type(f'{result_model.__name__}Admin', (LargeTableAdmin,), {
+        'list_display': ('student', field, 'score', 'graded_at'),
+        'list_filter': ('graded_at', f'{field}__subject__course'),
+        'search_fields': ('^student__last_name', '^student__email'),
+        'autocomplete_fields': ('student', field),
+    })
+
+
+for _assessment_model in (Quiz, Exam, Activity):
+    admin.site.register(_assessment_model, AssessmentAdmin)
+for _result_model in (QuizResult, ExamResult, ActivityResult):
+    admin.site.register(_result_model, result_admin(_result_model))
+
+
+@admin.register(StudentSubjectGrade)
+class StudentSubjectGradeAdmin(LargeTableAdmin):
+    """Maintained by app.grades, so read-only here."""
+    list_display = ('student', 'subject', 'assessment_type', 'count', 'score_sum', 'total_marks_sum')
+    list_filter = ('assessment_type',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Promotion)
+class PromotionAdmin(LargeTableAdmin):
+    """Promotions are made and undone through the API (app.promotion)."""
+    list_display = ('course', 'from_year_level', 'to_year_level', 'section', 'student_count', 'created_at', 'undone_at')
+    list_select_related = ('course', 'from_year_level', 'to_year_level', 'section')
+    list_filter = ('course',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(LargeTableAdmin):
+    """Report jobs are submitted through the API (app.reports)."""
+    list_display = ('pk', 'status', 'student', 'course', 'year_level', 'section', 'student_count', 'created_at')
+    list_select_related = ('student', 'course', 'year_level', 'section')
+    list_filter = ('status',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
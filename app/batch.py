@@ -0,0 +1,102 @@
+"""
+Many API calls in one HTTP round trip.
+
+`POST /api/batch/` carries a list of operations (method, path, body) against
+the router's URLs. They are dispatched in-process, in order, with the batch
+request's user: authentication and the middleware stack run once for the
+whole batch instead of once per call. With "atomic", the operations share one
+transaction, and the first one that fails rolls all of them back and ends the
+batch.
+"""
+import io
+import json
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from django.db import transaction
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, reverse
+from django.urls.resolvers import RegexPattern, URLResolver
+from rest_framework.response import Response
+
+from .cache import bypass_cache
+
+# Conditional and body headers of the batch request describe the batch, not its operations.
+DROPPED_HEADERS = ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE',
+                   'HTTP_IF_MATCH', 'HTTP_IF_UNMODIFIED_SINCE', 'HTTP_IF_RANGE', 'HTTP_RANGE')
+RETURNED_HEADERS = ('Content-Type', 'ETag', 'Location')
+
+
+@lru_cache(maxsize=None)
+def router_resolver():
+    # Only the router's own URLs: not the batch endpoint itself, and never the
+    # async views that shadow some of them under ASGI.
+    from .urls import router
+    return URLResolver(RegexPattern('^' + re.escape(reverse('api-root'))), router.urls)
+
+
+def _subrequest(request, method, path, body):
+    url = urlsplit(path)
+    data = b'' if body is None else json.dumps(body).encode()
+    sub = HttpRequest()
+    sub.method = method
+    sub.path = sub.path_info = url.path
+    sub.META = {key: value for key, value in request.META.items() if key not in DROPPED_HEADERS}
+    sub.META.update({
+        'REQUEST_METHOD': method, 'PATH_INFO': url.path, 'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json', 'CONTENT_LENGTH': str(len(data)), 'HTTP_ACCEPT': 'application/json, */*',
+    })
+    sub.GET = QueryDict(url.query)
+    sub._stream = io.BytesIO(data)
+    sub._read_started = False
+    # DRF's Request authenticates these as given, so the batch's user is reused as is.
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+def _result(response):
+    if response.streaming:
+        # Exports stream arbitrarily large bodies; buffering one here would defeat that.
+        response.close()
+        return {'status': 400, 'headers': {}, 'body': {
+            'detail': 'Streamed responses such as exports cannot be batched; request them directly.',
+        }}
+    if isinstance(response, Response):
+        body = response.data
+    elif response.get('Content-Type', '').startswith('application/json'):
+        body = json.loads(response.content) if response.content else None
+    else:
+        body = response.content.decode()
+    headers = {name: response[name] for name in RETURNED_HEADERS if response.has_header(name)}
+    return {'status': response.status_code, 'headers': headers, 'body': body}
+
+
+def dispatch(request, path, method='GET', body=None):
+    """The response of one operation, as {'status', 'headers', 'body'}."""
+    try:
+        match = router_resolver().resolve(urlsplit(path).path)
+    except Resolver404:
+        return {'status': 404, 'headers': {}, 'body': {'detail': f'No API endpoint at {path}.'}}
+    sub = _subrequest(request, method, path, body)
+    sub.resolver_match = match
+    return _result(match.func(sub, *match.args, **match.kwargs))
+
+
+def run_batch(request, operations, atomic=False):
+    """
+    Dispatch `operations` in order and return their results. In an atomic
+    batch, the first failure rolls back everything and ends the batch.
+    """
+    if not atomic:
+        return [dispatch(request, **operation) for operation in operations]
+    results = []
+    # Responses built from writes that may be rolled back must not reach the caches.
+    with bypass_cache(), transaction.atomic():
+        for operation in operations:
+            results.append(dispatch(request, **operation))
+            if results[-1]['status'] >= 400:
+                transaction.set_rollback(True)
+                break
+    return results
@@ -0,0 +1,34 @@
+"""
+The worker processes of app.benchmarks.concurrent_writes().
+
+They are spawned, not forked, so this module is imported before Django is set
+up and must not import models at the top level: writer() sets Django up itself.
+"""
+import os
+import time
+
+
+def writer(settings_module, path, options, worker, writes, queue):
+    """Commit `writes` read-then-write transactions against the SQLite file at `path` and report the timings."""
+    os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+    import django
+    django.setup()
+
+    from django.db import OperationalError, connections, transaction
+
+    from .models import Course
+
+    # Point the settings at the benchmark database before the first connection is opened.
+    connections['default'].settings_dict.update(NAME=path, OPTIONS=options)
+    timings, errors = [], 0
+    for i in range(writes):
+        start = time.perf_counter()
+        try:
+            with transaction.atomic():
+                Course.objects.filter(code__startswith=f'W{worker}-').count()
+                Course.objects.create(name=f'Writer {worker}', code=f'W{worker}-{i}')
+        except OperationalError:
+            errors += 1
+        timings.append(time.perf_counter() - start)
+    connections.close_all()
+    queue.put((timings, errors))
@@ -0,0 +1,307 @@
+"""
+Endpoint benchmarks driven through the Django test client.
+
+Each case is timed over `repeat` requests after one warm-up request and
+reports throughput, p50/p95 latency and queries per request. Results are
+plain JSON so a baseline from one commit can be diffed against another
+(`manage.py benchmark --compare baseline.json`).
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from StudentManagementSystem.profiling import _percentile
+
+from .cache import get_cache
+from .grades import RESULT_MODELS
+from .models import Student, Course, QuizResult, AssessmentResult, assessment_field
+from .renderers import FastJSONRenderer
+from .serializers import ValuesRepresentation
+from .urls import router
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+@dataclass
+class Case:
+    name: str
+    method: str
+    path: str
+    body: Optional[Callable[[int], object]] = None
+    content_type: str = 'application/json'
+    headers: dict = field(default_factory=dict)
+
+
+def default_cases():
+    """List and retrieve for every router endpoint, plus the write and bulk paths."""
+    cases = []
+    for prefix, viewset, _ in router.registry:
+        cases.append(Case(f'{prefix}.list', 'get', f'/api/{prefix}/?page_size=100'))
+        pk = viewset.queryset.model.objects.values_list('pk', flat=True).first()
+        if pk is not None:
+            cases.append(Case(f'{prefix}.retrieve', 'get', f'/api/{prefix}/{pk}/'))
+
+    cases.append(Case('courses.create', 'post', '/api/courses/', body=lambda i: {
+        'name': f'Benchmark course {i}', 'code': f'BEN{i}',
+    }))
+    cases.append(Case('students.create', 'post', '/api/students/', body=lambda i: {
+        'first_name': 'Bench', 'last_name': f'Mark {i}', 'email': f'bench.{i}.{time.time_ns()}@example.edu',
+        'date_of_birth': '2000-01-01',
+    }))
+
+    quiz_field = assessment_field(QuizResult).attname
+    rows = [
+        {'quiz': row[quiz_field], 'student': str(row['student_id']), 'score': 1}
+        for row in QuizResult.objects.values(quiz_field, 'student_id')[:1000]
+    ]
+    if rows:
+        cases.append(Case(f'quiz-results.bulk[{len(rows)}]', 'post', '/api/quiz-results/bulk/', body=lambda i: rows))
+
+    cases.append(Case('students.list[500]', 'get', '/api/students/?page_size=500'))
+    cases.append(Case(
+        'students.list[500,fields]', 'get', '/api/students/?page_size=500&fields=id,student_id,last_name,first_name'
+    ))
+
+    student = Student.objects.filter(results__isnull=False).values_list('pk', flat=True).first()
+    if student is not None:
+        cases.append(Case('results.transcript', 'get', f'/api/results/?student={student}&page_size=500'))
+
+    course = Course.objects.filter(students__isnull=False).values_list('pk', flat=True).first()
+    if course is not None:
+        cases.append(Case('students.export', 'get', f'/api/students/export/?format=ndjson&course={course}'))
+    return cases
+
+
+def run_case(client, case, repeat):
+    timings, queries, statuses = [], [], set()
+    for i in range(repeat + 1):
+        kwargs = dict(case.headers)
+        if case.body is not None:
+            kwargs.update(data=json.dumps(case.body(i)), content_type=case.content_type)
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = getattr(client, case.method)(case.path, **kwargs)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - start
+        if i:  # The first request warms caches and connections.
+            timings.append(elapsed)
+            queries.append(len(context))
+            statuses.add(response.status_code)
+
+    return {
+        'requests': repeat,
+        'throughput_rps': round(repeat / sum(timings), 2),
+        'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+        'p50_ms': round(_percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(_percentile(timings, 95) * 1000, 3),
+        'queries': statistics.median_low(queries),
+        'status': sorted(statuses),
+    }
+
+
+def serializer_throughput(limit=5000, repeat=3):
+    """
+    Rows per second for each router endpoint's serializer over up to `limit`
+    rows, building representations from model instances (the serializer) and
+    from values() rows (ValuesRepresentation). Loading the rows is included.
+    """
+    results = {}
+    for prefix, viewset, _ in router.registry:
+        serializer_class = viewset.serializer_class
+        representation = ValuesRepresentation.for_serializer(serializer_class())
+        if representation is None:
+            continue
+        queryset = viewset.queryset
+        count = min(queryset.count(), limit)
+        if not count:
+            continue
+        timings = {
+            'serializer': lambda: serializer_class(list(queryset[:limit]), many=True).data,
+            'values': lambda: representation.represent(list(representation.values(queryset)[:limit])),
+        }
+        result = {'rows': count}
+        for name, build in timings.items():
+            best = min(_timed(build) for _ in range(repeat))
+            result[f'{name}_rows_per_s'] = round(count / best)
+        result['speedup'] = round(result['values_rows_per_s'] / result['serializer_rows_per_s'], 2)
+        results[prefix] = result
+    return results
+
+
+def render_throughput(prefixes=('students', 'quiz-results', 'results'), limit=500, repeat=5):
+    """
+    Encode time of a `limit`-row list response with DRF's JSONRenderer and
+    FastJSONRenderer, and its size raw, gzipped and (with brotli installed) as
+    CompressionMiddleware sends it with brotli.
+    """
+
+    results = {}
+    for prefix, viewset, _ in router.registry:
+        if prefix not in prefixes:
+            continue
+        serializer_class = viewset.serializer_class
+        representation = ValuesRepresentation.for_serializer(serializer_class())
+        if representation is not None:
+            data = representation.represent(list(representation.values(viewset.queryset)[:limit]))
+        else:
+            data = serializer_class(list(viewset.queryset[:limit]), many=True).data
+        if not data:
+            continue
+        result = {'rows': len(data)}
+        for name, renderer in (('stdlib', JSONRenderer()), ('fast', FastJSONRenderer())):
+            best = min(_timed(lambda: renderer.render(data)) for _ in range(repeat))
+            result[f'{name}_ms'] = round(best * 1000, 2)
+        content = FastJSONRenderer().render(data)
+        result['speedup'] = round(result['stdlib_ms'] / max(result['fast_ms'], 1e-6), 2)
+        result['bytes'] = len(content)
+        result['gzip_bytes'] = len(compress_string(content))
+        if brotli is not None:
+            result['br_bytes'] = len(brotli.compress(content, quality=settings.RESPONSE_BROTLI_QUALITY))
+        results[prefix] = result
+    return results
+
+
+def _legacy_transcript(student):
+    # One query per result table, then each result's assessment loaded on access.
+    rows = []
+    for result_model in RESULT_MODELS:
+        kind = assessment_field(result_model).name
+        for result in result_model.objects.filter(student=student):
+            assessment = getattr(result, kind)
+            rows.append((kind, assessment.subject_id, assessment.title, result.score, assessment.total_marks))
+    return rows
+
+
+def _unified_transcript(student):
+    return list(AssessmentResult.objects.filter(student=student).values_list(
+        'assessment_type', 'subject_id', 'title', 'score', 'total_marks',
+    ))
+
+
+def transcript_queries(sample=20):
+    """
+    Queries and time per student transcript (every result with its assessment's
+    subject, title and total marks) read from the three result tables versus the
+    unified AssessmentResult view, averaged over `sample` students.
+    """
+    students = list(Student.objects.filter(results__isnull=False).distinct().values_list('pk', flat=True)[:sample])
+    report = {'students': len(students)}
+    for name, build in (('tables', _legacy_transcript), ('view', _unified_transcript)):
+        queries, timings = [], []
+        for student in students:
+            with CaptureQueriesContext(connection) as context:
+                timings.append(_timed(lambda: build(student)))
+            queries.append(len(context))
+        report[name] = {
+            'queries': round(statistics.fmean(queries), 1) if queries else 0,
+            'mean_ms': round(statistics.fmean(timings) * 1000, 3) if timings else 0,
+        }
+    return report
+
+
+def _timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(cases=None, repeat=20, only=None, meta=None):
+    get_cache().clear()
+    client = Client()
+    cases = default_cases() if cases is None else cases
+    results = {}
+    for case in cases:
+        if only and not any(name in case.name for name in only):
+            continue
+        results[case.name] = run_case(client, case, repeat)
+    return {
+        'meta': {
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'students': Student.objects.count(),
+            'repeat': repeat,
+            **(meta or {}),
+        },
+        'cases': results,
+    }
+
+
+def compare(baseline, current):
+    """Per-case change between two benchmark reports, as (name, metric, before, after, change %) rows."""
+    rows = []
+    for name, after in current['cases'].items():
+        before = baseline['cases'].get(name)
+        if before is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms', 'throughput_rps', 'queries'):
+            if metric not in before or metric not in after:
+                continue
+            change = (after[metric] - before[metric]) / before[metric] * 100 if before[metric] else None
+            rows.append((name, metric, before[metric], after[metric], change))
+    return rows
+
+
+def concurrent_writes(path, options, workers=8, writes=100):
+    """
+    Run `workers` processes that each commit `writes` read-then-write
+    transactions against the SQLite file at `path`, opened with `options`.
+    """
+    import multiprocessing
+
+    from django.db import connections
+
+    from .benchmark_writer import writer
+
+    connections.close_all()
+    # Spawn rather than fork: fork is unavailable on Windows and unsafe on macOS.
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    processes = [
+        context.Process(target=writer, args=(settings.SETTINGS_MODULE, path, options, worker, writes, queue))
+        for worker in range(workers)
+    ]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    outcomes = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    timings = [timing for worker_timings, _ in outcomes for timing in worker_timings]
+    errors = sum(worker_errors for _, worker_errors in outcomes)
+    return {
+        'transactions': len(timings),
+        'locked_errors': errors,
+        'commits_per_s': round((len(timings) - errors) / elapsed, 1),
+        'p50_ms': round(_percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(_percentile(timings, 95) * 1000, 3),
+        'max_ms': round(max(timings) * 1000, 3),
+    }
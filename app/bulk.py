@@ -0,0 +1,277 @@
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from .grades import refresh_grades
+from .models import Student, Course, YearLevel, Section, Subject, assessment_field
+from .stats import invalidate_assessments
+
+
+def _clean_value(field, name, value, errors):
+    if value in (None, ''):
+        errors[name] = ['This field is required.']
+        return None
+    try:
+        if isinstance(field, models.IntegerField):
+            # The model field's to_python() truncates 7.5 to 7; the serializer field rejects it.
+            value = serializers.IntegerField().to_internal_value(value)
+        else:
+            value = field.to_python(value)
+        if field.get_internal_type().startswith('Positive') and value < 0:
+            raise ValidationError('Ensure this value is greater than or equal to 0.')
+    except serializers.ValidationError as exc:
+        errors[name] = exc.detail
+        return None
+    except (ValidationError, TypeError) as exc:
+        errors[name] = getattr(exc, 'messages', [str(exc)])
+        return None
+    return value
+
+
+def ingest_results(result_model, rows):
+    """
+    Validate and upsert a batch of result rows in one transaction.
+
+    Each row is a mapping with `student`, `score` and the assessment key
+    (`quiz`, `exam` or `activity`). Scores are checked against `total_marks`
+    with a single lookup per table instead of one `full_clean()` per row, and
+    rows are written with `bulk_create` upserting on `unique_together`, so
+    re-submitting a grade overwrites the previous score.
+
+    Returns `(count, errors)`; nothing is written unless `errors` is empty.
+    """
+    assessment = assessment_field(result_model)
+    student = result_model._meta.get_field('student')
+    score = result_model._meta.get_field('score')
+
+    errors, parsed = [], []
+    for index, row in enumerate(rows):
+        row_errors = {}
+        if not isinstance(row, dict):
+            errors.append({'row': index, 'errors': {'non_field_errors': ['Expected an object.']}})
+            continue
+        values = (
+            _clean_value(assessment.target_field, assessment.name, row.get(assessment.name), row_errors),
+            _clean_value(student.target_field, student.name, row.get(student.name), row_errors),
+            _clean_value(score, score.name, row.get(score.name), row_errors),
+        )
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+        parsed.append((index, values, row_errors))
+
+    assessments = assessment.related_model.objects.only('total_marks').in_bulk(
+        {values[0] for _, values, row_errors in parsed if assessment.name not in row_errors}
+    )
+    students = Student.objects.only('pk').in_bulk(
+        {values[1] for _, values, row_errors in parsed if student.name not in row_errors}
+    )
+
+    objects, seen = [], set()
+    for index, (assessment_id, student_id, value), row_errors in parsed:
+        if row_errors:
+            continue
+        if assessment_id not in assessments:
+            row_errors[assessment.name] = [f'Invalid pk "{assessment_id}" - object does not exist.']
+        elif value > assessments[assessment_id].total_marks:
+            row_errors[score.name] = [f'Score cannot exceed total marks ({assessments[assessment_id].total_marks}).']
+        if student_id not in students:
+            row_errors[student.name] = [f'Invalid pk "{student_id}" - object does not exist.']
+        if (assessment_id, student_id) in seen:
+            row_errors['non_field_errors'] = [f'Duplicate {assessment.name} and student in this batch.']
+        seen.add((assessment_id, student_id))
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+            continue
+        objects.append(result_model(**{
+            assessment.attname: assessment_id,
+            student.attname: student_id,
+            score.attname: value,
+        }))
+
+    if errors:
+        errors.sort(key=lambda error: error['row'])
+        return 0, errors
+
+    with transaction.atomic():
+        result_model.objects.bulk_create(
+            objects,
+            update_conflicts=True,
+            unique_fields=[assessment.name, student.name],
+            update_fields=[score.name, 'updated_at'],
+        )
+        refresh_grades(result_model, [obj.student_id for obj in objects])
+        invalidate_assessments(assessment.related_model, {getattr(obj, assessment.attname) for obj in objects})
+    return len(objects), []
+
+
+# Student columns a roster row may set, and those a new student must have.
+ROSTER_FIELDS = ('student_id', 'email', 'first_name', 'middle_name', 'last_name', 'date_of_birth')
+ROSTER_REQUIRED = ('email', 'first_name', 'last_name', 'date_of_birth')
+# Roster column -> (model, natural key) for the foreign keys.
+ROSTER_REFERENCES = {'course': (Course, 'code'), 'year_level': (YearLevel, 'year'), 'section': (Section, 'section')}
+
+
+def _subject_codes(value, errors):
+    if value in (None, ''):
+        return []
+    if isinstance(value, str):
+        value = value.split(';')
+    if not isinstance(value, list):
+        errors['subjects'] = ['Expected a list of subject codes.']
+        return []
+    return list(dict.fromkeys(str(code).strip() for code in value if str(code).strip()))
+
+
+def _parse_roster_row(row, errors):
+    values, references = {}, {}
+    for name in ROSTER_FIELDS:
+        if row.get(name) in (None, ''):
+            continue
+        try:
+            values[name] = Student._meta.get_field(name).clean(row[name], None)
+        except ValidationError as exc:
+            errors[name] = exc.messages
+    for name, (model, key) in ROSTER_REFERENCES.items():
+        if row.get(name) in (None, ''):
+            continue
+        try:
+            references[name] = model._meta.get_field(key).to_python(str(row[name]).strip())
+        except ValidationError as exc:
+            errors[name] = exc.messages
+    return values, references, _subject_codes(row.get('subjects'), errors)
+
+
+def import_roster(rows, dry_run=False):
+    """
+    Create or update Students from roster rows and enrol them in subjects, in one
+    transaction.
+
+    Rows are matched to existing students on `email` or `student_id`; the other
+    columns (`first_name`, `middle_name`, `last_name`, `date_of_birth`) are set
+    when present. `course`, `year_level` and `section` are given by code, year
+    and section name, and `subjects` as a list (or `;`-separated string) of
+    subject codes within the student's course. Every reference table is read
+    with one query for the whole batch, and enrolments are added through the
+    many-to-many table with one `bulk_create`; existing enrolments are kept.
+
+    Returns `(summary, errors)` with created, updated and enrolled counts.
+    Nothing is written unless `errors` is empty, nor when `dry_run` is set.
+    Matched students are locked until the transaction ends; a conflict with a
+    concurrent write is reported as an error for the whole batch.
+    """
+    try:
+        with transaction.atomic():
+            return _import_roster(rows, dry_run)
+    except IntegrityError:
+        return None, [{'row': None, 'errors': {'non_field_errors': [
+            'An email or student_id in this roster was taken by another student meanwhile; import it again.'
+        ]}}]
+
+
+def _import_roster(rows, dry_run):
+    errors, parsed = [], []
+    for index, row in enumerate(rows):
+        row_errors = {}
+        if not isinstance(row, dict):
+            errors.append({'row': index, 'errors': {'non_field_errors': ['Expected an object.']}})
+            continue
+        parsed.append((index, *_parse_roster_row(row, row_errors), row_errors))
+
+    emails = {values['email'] for _, values, _, _, _ in parsed if 'email' in values}
+    student_ids = {values['student_id'] for _, values, _, _, _ in parsed if 'student_id' in values}
+    existing = list(Student.objects.select_for_update().filter(Q(email__in=emails) | Q(student_id__in=student_ids)))
+    by_email = {student.email: student for student in existing}
+    by_student_id = {student.student_id: student for student in existing if student.student_id is not None}
+
+    lookups = {}
+    for name, (model, key) in ROSTER_REFERENCES.items():
+        keys = {references[name] for _, _, references, _, _ in parsed if name in references}
+        lookups[name] = dict(model.objects.filter(**{f'{key}__in': keys}).values_list(key, 'pk')) if keys else {}
+    codes = {code for _, _, _, subject_codes, _ in parsed for code in subject_codes}
+    subjects = {}
+    for code, course_id, pk in Subject.objects.filter(code__in=codes).values_list('code', 'course_id', 'pk'):
+        subjects.setdefault(code, {})[course_id] = pk
+
+    created, updated, enrolments, seen = [], {}, [], set()
+    changed_fields = set()
+    for index, values, references, subject_codes, row_errors in parsed:
+        student = by_email.get(values.get('email'))
+        other = by_student_id.get(values.get('student_id'))
+        if student and other and student.pk != other.pk:
+            row_errors['non_field_errors'] = ['email and student_id belong to different students.']
+        student = student or other
+        keys = {
+            (name, value) for name, value in
+            (('email', values.get('email')), ('student_id', values.get('student_id')), ('pk', getattr(student, 'pk', None)))
+            if value is not None
+        }
+        if seen & keys:
+            row_errors['non_field_errors'] = ['Duplicate student in this batch.']
+        seen |= keys
+        if student is None:
+            for name in ROSTER_REQUIRED:
+                if name not in values and name not in row_errors:
+                    row_errors[name] = ['This field is required.']
+
+        for name, key in references.items():
+            if key not in lookups[name]:
+                row_errors[name] = [f'Unknown {name.replace("_", " ")} "{key}".']
+            else:
+                values[f'{name}_id'] = lookups[name][key]
+        course_id = values.get('course_id', getattr(student, 'course_id', None))
+        subject_ids = []
+        for code in subject_codes:
+            candidates = subjects.get(code, {})
+            if course_id in candidates:
+                subject_ids.append(candidates[course_id])
+            elif course_id is None and len(candidates) == 1:
+                subject_ids.extend(candidates.values())
+            elif candidates and course_id is None:
+                row_errors.setdefault('subjects', []).append(f'Subject "{code}" is ambiguous; set the course.')
+            else:
+                row_errors.setdefault('subjects', []).append(f'Unknown subject "{code}" in this course.')
+
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+            continue
+        if student is None:
+            student = Student(**values)
+            created.append(student)
+        else:
+            changes = {name for name, value in values.items() if getattr(student, name) != value}
+            for name in changes:
+                setattr(student, name, values[name])
+            if changes:
+                updated[student.pk] = student
+                changed_fields |= changes
+        enrolments.extend((student.pk, subject_id) for subject_id in subject_ids)
+
+    if errors:
+        errors.sort(key=lambda error: error['row'])
+        return None, errors
+
+    through = Student.subject.through
+    enrolled = set(through.objects.filter(
+        student_id__in=[student.pk for student in existing], subject_id__in={pk for _, pk in enrolments},
+    ).values_list('student_id', 'subject_id')) if existing and enrolments else set()
+    enrolments = [pair for pair in dict.fromkeys(enrolments) if pair not in enrolled]
+    summary = {'created': len(created), 'updated': len(updated), 'enrolled': len(enrolments), 'dry_run': dry_run}
+    if dry_run:
+        return summary, []
+
+    # A new enrolment changes the student's subject list, so it bumps updated_at too (see app.sync).
+    newly_enrolled = {student_id for student_id, _ in enrolments}
+    touched = {**{student.pk: student for student in existing if student.pk in newly_enrolled}, **updated}
+    Student.objects.bulk_create(created)
+    if touched:
+        now = timezone.now()
+        for student in touched.values():
+            student.updated_at = now
+        Student.objects.bulk_update(touched.values(), fields=[*sorted(changed_fields), 'updated_at'])
+    through.objects.bulk_create(
+        [through(student_id=student_id, subject_id=subject_id) for student_id, subject_id in enrolments],
+        ignore_conflicts=True,
+    )
+    return summary, []
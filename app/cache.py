@@ -0,0 +1,81 @@
+import hashlib
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+
+from .models import Course, YearLevel, Section, Subject
+
+# Reference data that changes rarely but is read on every page load.
+CACHED_MODELS = (Course, YearLevel, Section, Subject)
+
+
+_bypassed = ContextVar('api_cache_bypassed', default=False)
+
+
+def get_cache():
+    return caches[settings.API_RESPONSE_CACHE]
+
+
+def cache_enabled():
+    return not _bypassed.get()
+
+
+@contextmanager
+def bypass_cache():
+    """
+    Neither read nor fill the response and statistics caches inside this
+    block, for work whose writes may still be rolled back (atomic batches).
+    """
+    token = _bypassed.set(True)
+    try:
+        yield
+    finally:
+        _bypassed.reset(token)
+
+
+def _version_key(model):
+    return f'api:version:{model._meta.label_lower}'
+
+
+def response_cache_key(model, request):
+    """
+    Key a response by model, the model's current version, the full path
+    (query parameters included) and the negotiated media type.
+    """
+    version = get_cache().get(_version_key(model), 0)
+    digest = hashlib.md5(f'{request.get_full_path()}|{request.accepted_media_type}'.encode()).hexdigest()
+    return f'api:response:{model._meta.label_lower}:{version}:{digest}'
+
+
+def _new_version(key):
+    """
+    Move `key` to a new version now, and again once the open transaction (if
+    any) commits: a concurrent read before the commit still sees the old rows
+    and could cache them under the first new version.
+    """
+    get_cache().set(key, uuid.uuid4().hex, None)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: get_cache().set(key, uuid.uuid4().hex, None))
+
+
+def invalidate_model(model):
+    """Retire every cached response for `model` by moving it to a new version."""
+    _new_version(_version_key(model))
+
+
+def _statistics_version_key(model, pk):
+    return f'api:statistics-version:{model._meta.label_lower}:{pk}'
+
+
+def statistics_cache_key(model, pk):
+    """Key for the statistics of one assessment or subject at its current version."""
+    version = get_cache().get(_statistics_version_key(model, pk), 0)
+    return f'api:statistics:{model._meta.label_lower}:{pk}:{version}'
+
+
+def invalidate_statistics(model, pk):
+    _new_version(_statistics_version_key(model, pk))
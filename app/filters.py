@@ -0,0 +1,157 @@
+import datetime
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, SearchFilter
+
+from .models import Student, QuizResult, ExamResult, ActivityResult, AssessmentResult, assessment_field
+
+
+def parse_date_bound(value, end=False):
+    """
+    Parse an ISO date or datetime into an aware datetime. A bare date used as an
+    upper bound means "through the end of that day"; a datetime is exclusive.
+    """
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        moment = datetime.datetime.combine(day + datetime.timedelta(days=int(end)), datetime.time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def parse_date_start(value):
+    return parse_date_bound(value)
+
+
+def parse_date_end(value):
+    return parse_date_bound(value, end=True)
+
+
+def field_lookups(model):
+    """
+    Query parameter -> ORM lookup for a model's own fields:
+    - `<fk>` / `<m2m>` for equality on a relation,
+    - `<datetime>_after` / `<datetime>_before` for date ranges,
+    - `<integer>_min` / `<integer>_max` for numeric ranges.
+    A lookup is either a lookup string or a `(lookup, parser)` pair.
+    """
+    lookups = {}
+    for field in model._meta.get_fields():
+        if field.auto_created and not field.concrete:
+            continue
+        name = field.name
+        if field.many_to_one or field.many_to_many:
+            lookups[name] = name
+        elif isinstance(field, models.DateTimeField):
+            lookups[f'{name}_after'] = (f'{name}__gte', parse_date_start)
+            lookups[f'{name}_before'] = (f'{name}__lt', parse_date_end)
+        elif isinstance(field, models.IntegerField) and not field.primary_key:
+            lookups[f'{name}_min'] = f'{name}__gte'
+            lookups[f'{name}_max'] = f'{name}__lte'
+    return lookups
+
+
+def scope_lookups(model):
+    """
+    Query parameter -> ORM lookup for narrowing a Student, *Result or
+    AssessmentResult queryset to a course, year level, section, subject and date range.
+    """
+    if model is Student:
+        return {
+            'course': 'course',
+            'year_level': 'year_level',
+            'section': 'section',
+            'subject': 'subject',
+            'date_from': ('created_at__gte', parse_date_start),
+            'date_to': ('created_at__lt', parse_date_end),
+        }
+    if model is AssessmentResult:
+        return {
+            'course': 'student__course',
+            'year_level': 'student__year_level',
+            'section': 'student__section',
+            'assessment_type': 'assessment_type',
+            'date_from': ('graded_at__gte', parse_date_start),
+            'date_to': ('graded_at__lt', parse_date_end),
+        }
+    if model not in (QuizResult, ExamResult, ActivityResult):
+        return {}
+    kind = assessment_field(model).name
+    return {
+        'course': 'student__course',
+        'year_level': 'student__year_level',
+        'section': 'student__section',
+        'subject': f'{kind}__subject',
+        'student': 'student',
+        kind: kind,
+        'date_from': ('graded_at__gte', parse_date_start),
+        'date_to': ('graded_at__lt', parse_date_end),
+    }
+
+
+def ordering_fields(model):
+    """
+    Non-null local fields that lead an index, so a client-selected ordering is
+    an index scan rather than a sort of the whole table.
+    """
+    indexed = {model._meta.pk.name}
+    indexed.update(field.name for field in model._meta.concrete_fields if field.unique or field.db_index)
+    indexed.update(index.fields[0].lstrip('-') for index in model._meta.indexes if index.fields)
+    return tuple(
+        field.name for field in model._meta.concrete_fields
+        if field.name in indexed and not field.is_relation and not field.null
+    )
+
+
+def filter_queryset(queryset, params, lookups):
+    """Apply every lookup whose parameter is present; invalid values raise a 400."""
+    for name, lookup in lookups.items():
+        value = params.get(name)
+        if value in (None, ''):
+            continue
+        lookup, parse = lookup if isinstance(lookup, tuple) else (lookup, None)
+        try:
+            queryset = queryset.filter(**{lookup: parse(value) if parse else value})
+        except (ValueError, TypeError, DjangoValidationError):
+            raise ValidationError({name: [f'Invalid value "{value}".']})
+    return queryset
+
+
+class LookupFilterBackend(BaseFilterBackend):
+    """Filters by the view's declarative `filter_lookups` (see field_lookups)."""
+
+    def filter_queryset(self, request, queryset, view):
+        return filter_queryset(queryset, request.query_params, getattr(view, 'filter_lookups', {}))
+
+
+class PrefixSearchFilter(SearchFilter):
+    """
+    Case-insensitive prefix search over the view's `search_fields`. Each term is
+    a range on LOWER(field) rather than a LIKE, so it is served by the Lower()
+    indexes on the model.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+
+        queryset = queryset.alias(**{f'{field}_lower': Lower(field) for field in search_fields})
+        for term in search_terms:
+            low = term.lower()
+            high = low[:-1] + chr(ord(low[-1]) + 1)
+            condition = Q()
+            for field in search_fields:
+                condition |= Q(**{f'{field}_lower__gte': low, f'{field}_lower__lt': high})
+            queryset = queryset.filter(condition)
+        return queryset
@@ -0,0 +1,116 @@
+from django.db import transaction
+from django.db.models import Count, Q, Sum, Value
+
+from .models import (
+    Student, QuizResult, ExamResult, ActivityResult, StudentSubjectGrade, AssessmentResult, assessment_field
+)
+
+RESULT_MODELS = (QuizResult, ExamResult, ActivityResult)
+
+# Keeps `student_id IN (...)` well below the bound-parameter limit of SQLite.
+STUDENT_BATCH_SIZE = 500
+
+
+def _aggregate(results):
+    """One StudentSubjectGrade per (student, subject, assessment type) found in `results`."""
+    rows = results.values('student_id', 'subject_id', 'assessment_type').annotate(
+        result_count=Count('pk'),
+        score_total=Sum('score'),
+        marks_total=Sum('total_marks'),
+    ).order_by()
+    return [
+        StudentSubjectGrade(
+            student_id=row['student_id'],
+            subject_id=row['subject_id'],
+            assessment_type=row['assessment_type'],
+            count=row['result_count'],
+            score_sum=row['score_total'],
+            total_marks_sum=row['marks_total'],
+        )
+        for row in rows.iterator()
+    ]
+
+
+def refresh_grades(result_model, student_ids):
+    """
+    Recompute the grade rows of `result_model`'s assessment type for the given
+    students. Cost is proportional to those students' results, not the table.
+    """
+    kind = assessment_field(result_model).name
+    student_ids = list(set(student_ids))
+    with transaction.atomic():
+        for start in range(0, len(student_ids), STUDENT_BATCH_SIZE):
+            batch = student_ids[start:start + STUDENT_BATCH_SIZE]
+            grades = _aggregate(AssessmentResult.objects.filter(assessment_type=kind, student_id__in=batch))
+            StudentSubjectGrade.objects.filter(assessment_type=kind, student_id__in=batch).delete()
+            StudentSubjectGrade.objects.bulk_create(grades)
+
+
+def rebuild_grades():
+    """Rebuild the whole summary table from the result tables. Returns the row count."""
+    with transaction.atomic():
+        StudentSubjectGrade.objects.all().delete()
+        return len(StudentSubjectGrade.objects.bulk_create(
+            _aggregate(AssessmentResult.objects.all()), batch_size=1000
+        ))
+
+
+def gradebook(subject, percentages=False):
+    """
+    The score matrix for `subject` in a columnar layout: one row per student
+    (enrolled, or with any result in the subject), one column per quiz, exam
+    and activity, and `None` where a student has no result. Three queries
+    whatever the class size: students, assessments, and all results.
+    """
+    kinds = [assessment_field(result_model) for result_model in RESULT_MODELS]
+    results = AssessmentResult.objects.filter(subject=subject).order_by()
+
+    in_subject = Q(subject=subject) | Q(pk__in=results.values('student_id'))
+    students = list(Student.objects.filter(in_subject).distinct().order_by('last_name', 'first_name', 'id').values(
+        'id', 'student_id', 'first_name', 'last_name',
+    ))
+
+    assessment_queries = [
+        kind.related_model.objects.filter(subject=subject).order_by().values(
+            'id', 'title', 'total_marks', 'created_at', type=Value(kind.name),
+        )
+        for kind in kinds
+    ]
+    order = {kind.name: index for index, kind in enumerate(kinds)}
+    assessments = sorted(
+        assessment_queries[0].union(*assessment_queries[1:], all=True),
+        key=lambda row: (order[row['type']], row['created_at'], row['id']),
+    )
+
+    columns = {(row['type'], row['id']): index for index, row in enumerate(assessments)}
+    rows = {student['id']: index for index, student in enumerate(students)}
+    scores = [[None] * len(assessments) for _ in students]
+    for student_id, kind, assessment_id, score in results.values_list(
+        'student_id', 'assessment_type', 'assessment_id', 'score',
+    ):
+        scores[rows[student_id]][columns[kind, assessment_id]] = score
+
+    data = {
+        'subject': {'id': subject.pk, 'name': subject.name, 'code': subject.code},
+        'columns': {
+            'type': [row['type'] for row in assessments],
+            'id': [row['id'] for row in assessments],
+            'title': [row['title'] for row in assessments],
+            'total_marks': [row['total_marks'] for row in assessments],
+        },
+        'students': {
+            'id': [student['id'] for student in students],
+            'student_id': [student['student_id'] for student in students],
+            'first_name': [student['first_name'] for student in students],
+            'last_name': [student['last_name'] for student in students],
+        },
+        'scores': scores,
+    }
+    if percentages:
+        marks = data['columns']['total_marks']
+        data['percentages'] = []
+        for row in scores:
+            earned = [(score, marks[index]) for index, score in enumerate(row) if score is not None]
+            total = sum(total_marks for _, total_marks in earned)
+            data['percentages'].append(round(100 * sum(score for score, _ in earned) / total, 2) if total else None)
+    return data
@@ -0,0 +1,114 @@
+"""
+Profile image thumbnails.
+
+Uploads are re-encoded into small square thumbnails (PROFILE_THUMBNAIL_SIZES,
+WebP by default) off the request path: saving a Student schedules the work on a
+thread pool once the transaction commits, and the worker records the generated
+names on `Student.profile_thumbnails`. Pillow releases the GIL while decoding,
+resizing and encoding, so threads give real parallelism here. Pending work is
+lost if the process exits; `manage.py backfill_thumbnails` picks it up.
+"""
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import Student
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_PROCESSING_WORKERS, thread_name_prefix='thumbnails'
+        )
+    return _executor
+
+
+def _image_field():
+    return Student._meta.get_field('profile_image')
+
+
+def thumbnail_name(source_name, size):
+    directory, filename = posixpath.split(source_name)
+    stem = posixpath.splitext(filename)[0]
+    extension = settings.PROFILE_THUMBNAIL_FORMAT.lower()
+    return posixpath.join(directory, 'thumbs', f'{stem}_{size}.{extension}')
+
+
+def needs_thumbnails(student):
+    name = student.profile_image.name if student.profile_image else ''
+    if not name or name == _image_field().default:
+        return bool(student.profile_thumbnails)
+    return student.profile_thumbnails.get('source') != name
+
+
+def render_thumbnails(source_name):
+    """Write every configured thumbnail size for `source_name` and return {size: name}."""
+    storage = _image_field().storage
+    sizes = sorted(settings.PROFILE_THUMBNAIL_SIZES)
+    with storage.open(source_name, 'rb') as source:
+        image = Image.open(source)
+        # For JPEGs, decode at the smallest DCT scale that still covers the largest
+        # thumbnail, which is far cheaper than decoding a full-size phone photo.
+        image.draft('RGB', (sizes[-1] * 2, sizes[-1] * 2))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    names = {}
+    for size in reversed(sizes):
+        image = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, settings.PROFILE_THUMBNAIL_FORMAT, quality=settings.PROFILE_THUMBNAIL_QUALITY)
+        name = thumbnail_name(source_name, size)
+        if storage.exists(name):
+            storage.delete(name)
+        names[str(size)] = storage.save(name, ContentFile(buffer.getvalue()))
+    return names
+
+
+def process_student_image(student_id):
+    """Generate thumbnails for a student's current image and record them, unless the image changed meanwhile."""
+    try:
+        student = Student.objects.only('profile_image', 'profile_thumbnails').get(pk=student_id)
+        if not needs_thumbnails(student):
+            return
+        source_name = student.profile_image.name if student.profile_image else ''
+        thumbnails = {}
+        if source_name and source_name != _image_field().default:
+            thumbnails = {'source': source_name, **render_thumbnails(source_name)}
+        Student.objects.filter(pk=student_id, profile_image=student.profile_image.name).update(
+            profile_thumbnails=thumbnails, updated_at=timezone.now()
+        )
+    except Student.DoesNotExist:
+        pass
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        logger.exception('Could not create thumbnails for student %s', student_id)
+
+
+def process_in_worker(student_id):
+    # Pool threads outlive requests, so release their connection after each job.
+    try:
+        process_student_image(student_id)
+    finally:
+        connection.close()
+
+
+def schedule_thumbnails(student):
+    """Queue thumbnail generation for after the current transaction commits."""
+    if not needs_thumbnails(student):
+        return
+    if settings.IMAGE_PROCESSING_ASYNC:
+        transaction.on_commit(lambda: get_executor().submit(process_in_worker, student.pk))
+    else:
+        transaction.on_commit(lambda: process_student_image(student.pk))
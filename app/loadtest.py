@@ -0,0 +1,112 @@
+"""
+HTTP load generator for comparing deployments (e.g. sync gunicorn against the
+ASGI server) at high concurrency.
+
+Unlike app.benchmarks, which drives views in-process, this opens `concurrency`
+real connections to a running server and keeps them busy until `requests` have
+completed. Reports have the same shape as benchmark reports, so
+`benchmarks.compare()` diffs them.
+"""
+import asyncio
+import platform
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from .benchmarks import _git_revision, _percentile
+
+
+class _Connection:
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def get(self, target, headers):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f'GET {target} HTTP/1.1', f'Host: {self.host}:{self.port}', *headers, '', '']
+        self.writer.write('\r\n'.join(lines).encode('latin-1'))
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        response_headers = {}
+        while (line := await self.reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if 'content-length' in response_headers:
+            await self.reader.readexactly(int(response_headers['content-length']))
+        elif response_headers.get('transfer-encoding') == 'chunked':
+            while size := int((await self.reader.readline()).split(b';')[0], 16):
+                await self.reader.readexactly(size + 2)
+            await self.reader.readline()
+        else:
+            await self.reader.read()
+            response_headers['connection'] = 'close'
+
+        if response_headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def _client(connection, target, headers, remaining, timings, statuses):
+    while remaining:
+        remaining.pop()
+        start = time.perf_counter()
+        try:
+            status = await connection.get(target, headers)
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+            connection.close()
+            status = 'error'
+        timings.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+    connection.close()
+
+
+async def _run(url, requests, concurrency, headers):
+    parts = urlsplit(url)
+    target = parts.path + (f'?{parts.query}' if parts.query else '')
+    remaining = list(range(requests))
+    timings, statuses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(_Connection(parts.hostname, parts.port or 80), target, headers, remaining, timings, statuses)
+        for _ in range(concurrency)
+    ))
+    return time.perf_counter() - start, timings, statuses
+
+
+def load_test(base_url, paths, requests=2000, concurrency=100, headers=(), meta=None):
+    """
+    Issue `requests` GETs for each of `paths` against the server at `base_url`
+    from `concurrency` concurrent keep-alive connections.
+    """
+    headers = ['Accept: application/json', *headers]
+    cases = {}
+    for path in paths:
+        elapsed, timings, statuses = asyncio.run(_run(base_url.rstrip('/') + path, requests, concurrency, headers))
+        cases[path] = {
+            'requests': requests,
+            'concurrency': concurrency,
+            'throughput_rps': round(requests / elapsed, 2),
+            'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+            'p50_ms': round(_percentile(timings, 50) * 1000, 3),
+            'p95_ms': round(_percentile(timings, 95) * 1000, 3),
+            'p99_ms': round(_percentile(timings, 99) * 1000, 3),
+            'errors': sum(count for status, count in statuses.items() if status == 'error' or status >= 500),
+            'status': sorted(str(status) for status in statuses),
+        }
+    return {
+        'meta': {
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'url': base_url,
+            **(meta or {}),
+        },
+        'cases': cases,
+    }
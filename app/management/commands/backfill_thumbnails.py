@@ -0,0 +1,34 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from app.images import needs_thumbnails, process_in_worker, process_student_image
+from app.models import Student
+
+
+class Command(BaseCommand):
+    help = "Generate missing or stale profile image thumbnails in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Parallel image workers.")
+        parser.add_argument('--force', action='store_true', help="Regenerate thumbnails that already exist.")
+
+    def handle(self, *args, **options):
+        students = Student.objects.exclude(profile_image='').exclude(profile_image__isnull=True).only(
+            'profile_image', 'profile_thumbnails'
+        )
+        if options['force']:
+            Student.objects.update(profile_thumbnails={})
+        pending = [student.pk for student in students.iterator() if needs_thumbnails(student)]
+
+        start = time.perf_counter()
+        if options['workers'] > 1:
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                list(executor.map(process_in_worker, pending))
+        else:
+            for pk in pending:
+                process_student_image(pk)
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {len(pending)} profile images in {time.perf_counter() - start:.1f}s."
+        ))
@@ -0,0 +1,104 @@
+import dataclasses
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from app.benchmarks import compare, render_throughput, run_benchmarks, serializer_throughput, transcript_queries
+from app.synthetic import SCALES, generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every API endpoint against a freshly generated synthetic dataset in a "
+        "throwaway test database, and optionally diff against a previous JSON baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='small', help="Synthetic dataset size.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=20, help="Timed requests per case (at least 1).")
+        parser.add_argument('--case', action='append', dest='cases', help="Only run cases containing this name.")
+        parser.add_argument('--output', help="Write the JSON report to this file.")
+        parser.add_argument('--compare', help="Baseline JSON report to diff against.")
+        parser.add_argument(
+            '--serializers', action='store_true',
+            help="Also measure serializer rows/s against the values() fast path.",
+        )
+        parser.add_argument(
+            '--renderers', action='store_true',
+            help="Also measure JSON encode time and gzip/brotli response sizes for large lists.",
+        )
+        parser.add_argument(
+            '--transcripts', action='store_true',
+            help="Also compare transcript reads from the result tables and the unified results view.",
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            counts = generate(SCALES[options['scale']], seed=options['seed'])
+            report = run_benchmarks(repeat=options['repeat'], only=options['cases'], meta={
+                'scale': options['scale'], 'scale_params': dataclasses.asdict(SCALES[options['scale']]), 'rows': counts,
+            })
+            if options['serializers']:
+                report['serializers'] = serializer_throughput()
+            if options['renderers']:
+                report['renderers'] = render_throughput()
+            if options['transcripts']:
+                report['transcripts'] = transcript_queries()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(f"{'case':<36} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} status")
+        for name, result in report['cases'].items():
+            self.stdout.write(
+                f"{name:<36} {result['throughput_rps']:>9.1f} {result['p50_ms']:>9.2f} "
+                f"{result['p95_ms']:>9.2f} {result['queries']:>8} {','.join(map(str, result['status']))}"
+            )
+
+        if 'serializers' in report:
+            self.stdout.write(f"\n{'serializer':<36} {'rows':>7} {'instances/s':>12} {'values/s':>10} {'speedup':>8}")
+            for prefix, result in report['serializers'].items():
+                self.stdout.write(
+                    f"{prefix:<36} {result['rows']:>7} {result['serializer_rows_per_s']:>12} "
+                    f"{result['values_rows_per_s']:>10} {result['speedup']:>7}x"
+                )
+
+        if 'renderers' in report:
+            self.stdout.write(
+                f"\n{'renderer':<36} {'rows':>7} {'stdlib ms':>10} {'fast ms':>8} {'speedup':>8} "
+                f"{'bytes':>9} {'gzip':>8} {'br':>8}"
+            )
+            for prefix, result in report['renderers'].items():
+                self.stdout.write(
+                    f"{prefix:<36} {result['rows']:>7} {result['stdlib_ms']:>10.2f} {result['fast_ms']:>8.2f} "
+                    f"{result['speedup']:>7}x {result['bytes']:>9} {result['gzip_bytes']:>8} "
+                    f"{result.get('br_bytes', '-'):>8}"
+                )
+
+        if 'transcripts' in report:
+            transcripts = report['transcripts']
+            self.stdout.write(f"\ntranscripts over {transcripts['students']} students")
+            for source in ('tables', 'view'):
+                self.stdout.write(
+                    f"{source:<36} {transcripts[source]['queries']:>7} queries {transcripts[source]['mean_ms']:>9.2f} ms"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if options['compare']:
+            with open(options['compare']) as baseline:
+                rows = compare(json.load(baseline), report)
+            self.stdout.write(f"\n{'case':<36} {'metric':<15} {'before':>10} {'after':>10} {'change':>8}")
+            for name, metric, before, after, change in rows:
+                change = f"{change:+.1f}%" if change is not None else '-'
+                self.stdout.write(f"{name:<36} {metric:<15} {before:>10} {after:>10} {change:>8}")
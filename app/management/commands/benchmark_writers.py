@@ -0,0 +1,49 @@
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from StudentManagementSystem.database import SQLITE_OPTIONS
+from app.benchmarks import concurrent_writes
+
+PROFILES = {
+    # SQLite's defaults: rollback journal, deferred transactions, 5s Python-level timeout.
+    'default': {},
+    'tuned': SQLITE_OPTIONS,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent SQLite writers with the default connection settings and with "
+        "the WAL/IMMEDIATE tuning from StudentManagementSystem.database, on a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help="Concurrent writer processes.")
+        parser.add_argument('--writes', type=int, default=100, help="Transactions per writer.")
+
+    def handle(self, *args, **options):
+        connection = connections['default']
+        original = dict(connection.settings_dict)
+        self.stdout.write(
+            f"{'profile':<10} {'commits/s':>10} {'locked':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"
+        )
+        try:
+            for name, profile in PROFILES.items():
+                with tempfile.TemporaryDirectory() as directory:
+                    path = os.path.join(directory, 'writers.sqlite3')
+                    connections.close_all()
+                    connection.settings_dict.update(NAME=path, OPTIONS=profile)
+                    call_command('migrate', verbosity=0)
+                    result = concurrent_writes(path, profile, workers=options['workers'], writes=options['writes'])
+                self.stdout.write(
+                    f"{name:<10} {result['commits_per_s']:>10} {result['locked_errors']:>8} "
+                    f"{result['p50_ms']:>9} {result['p95_ms']:>9} {result['max_ms']:>9}"
+                )
+        finally:
+            connections.close_all()
+            connection.settings_dict.clear()
+            connection.settings_dict.update(original)
@@ -0,0 +1,51 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from app.benchmarks import compare
+from app.loadtest import load_test
+
+DEFAULT_PATHS = ('/api/students/', '/api/quiz-results/?page_size=100')
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test a running server with many concurrent connections, e.g. the WSGI and ASGI "
+        "deployments in turn, and optionally diff against a previous JSON report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Base URL of the running server.")
+        parser.add_argument('--path', action='append', dest='paths', help="Path to request (repeatable).")
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per path.")
+        parser.add_argument('--concurrency', type=int, default=100, help="Concurrent connections.")
+        parser.add_argument('--header', action='append', dest='headers', default=[], help="Extra request header.")
+        parser.add_argument('--label', help="Recorded in the report, e.g. 'wsgi' or 'asgi'.")
+        parser.add_argument('--output', help="Write the JSON report to this file.")
+        parser.add_argument('--compare', help="Baseline JSON report to diff against.")
+
+    def handle(self, *args, **options):
+        report = load_test(
+            options['url'], options['paths'] or DEFAULT_PATHS, requests=options['requests'],
+            concurrency=options['concurrency'], headers=options['headers'], meta={'label': options['label']},
+        )
+
+        self.stdout.write(f"{'path':<40} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} status")
+        for path, result in report['cases'].items():
+            self.stdout.write(
+                f"{path:<40} {result['throughput_rps']:>9.1f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                f"{result['p99_ms']:>9.2f} {result['errors']:>7} {','.join(result['status'])}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if options['compare']:
+            with open(options['compare']) as baseline:
+                rows = compare(json.load(baseline), report)
+            self.stdout.write(f"\n{'path':<40} {'metric':<15} {'before':>10} {'after':>10} {'change':>8}")
+            for name, metric, before, after, change in rows:
+                change = f"{change:+.1f}%" if change is not None else '-'
+                self.stdout.write(f"{name:<40} {metric:<15} {before:>10} {after:>10} {change:>8}")
@@ -0,0 +1,45 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from StudentManagementSystem.profiling import load_samples, profiling_report
+
+
+class Command(BaseCommand):
+    help = "Summarise the request profiling log: per-endpoint latency percentiles, queries and slow requests."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=settings.PROFILING_LOG, help="Profiling log to read.")
+        parser.add_argument('--json', action='store_true', help="Print the full report as JSON.")
+        parser.add_argument('--slowest', type=int, default=10, help="Number of slow requests to list.")
+        parser.add_argument('--reset', action='store_true', help="Truncate the log after reporting.")
+
+    def handle(self, *args, **options):
+        report = profiling_report(load_samples(options['log']), slowest=options['slowest'])
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.stdout.write(
+                f"{'endpoint':<36} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+                f"{'queries':>8} {'db ms':>8} {'ser ms':>8} {'bytes':>9}"
+            )
+            for endpoint in report['endpoints']:
+                name = f"{endpoint['basename']}.{endpoint['action']}"
+                self.stdout.write(
+                    f"{name:<36} "
+                    f"{endpoint['count']:>6} {endpoint['wall_ms_p50']:>9.1f} {endpoint['wall_ms_p95']:>9.1f} "
+                    f"{endpoint['wall_ms_p99']:>9.1f} {endpoint['queries_mean']:>8.1f} {endpoint['db_ms_mean']:>8.1f} "
+                    f"{endpoint['serializer_ms_mean']:>8.1f} {endpoint['bytes_mean'] or '-':>9}"
+                )
+            if report['slow_requests']:
+                self.stdout.write("\nSlowest flagged requests:")
+            for sample in report['slow_requests']:
+                self.stdout.write(
+                    f"  {sample['method']} {sample['path']} {sample['wall_ms']:.1f} ms, {sample['queries']} queries"
+                )
+                for query in sample['sql'][:5]:
+                    self.stdout.write(f"    {query['ms']:.2f} ms  {query['sql'][:160]}")
+        if options['reset'] and os.path.exists(options['log']):
+            open(options['log'], 'w').close()
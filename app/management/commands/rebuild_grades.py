@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app.grades import rebuild_grades
+
+
+class Command(BaseCommand):
+    help = "Rebuild the StudentSubjectGrade summary table from the quiz, exam and activity results."
+
+    def handle(self, *args, **options):
+        count = rebuild_grades()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} grade rows."))
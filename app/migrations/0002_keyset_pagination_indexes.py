@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activityresult',
+            index=models.Index(fields=['-graded_at', '-id'], name='app_activit_graded__44c1fe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['name', 'id'], name='app_course_name_992ae9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examresult',
+            index=models.Index(fields=['-graded_at', '-id'], name='app_examres_graded__cbda3a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizresult',
+            index=models.Index(fields=['-graded_at', '-id'], name='app_quizres_graded__9e62ea_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='app_student_last_na_037feb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(fields=['name', 'id'], name='app_subject_name_a2654a_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSubjectGrade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assessment_type', models.CharField(choices=[('quiz', 'Quiz'), ('exam', 'Exam'), ('activity', 'Activity')], max_length=10)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.PositiveIntegerField(default=0)),
+                ('total_marks_sum', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grades', to='app.student')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grades', to='app.subject')),
+            ],
+            options={
+                'ordering': ['student_id', 'subject_id', 'assessment_type'],
+                'indexes': [models.Index(fields=['subject', 'assessment_type'], name='app_student_subject_97ffdf_idx')],
+                'unique_together': {('student', 'subject', 'assessment_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:58
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_student_subject_grade'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['subject', 'created_at'], name='app_activit_subject_ef03d3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activityresult',
+            index=models.Index(fields=['student', 'graded_at'], name='app_activit_student_c3d3b2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['subject', 'created_at'], name='app_exam_subject_c8dd9f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examresult',
+            index=models.Index(fields=['student', 'graded_at'], name='app_examres_student_7859a8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['subject', 'created_at'], name='app_quiz_subject_c4c65b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizresult',
+            index=models.Index(fields=['student', 'graded_at'], name='app_quizres_student_51a05e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(django.db.models.functions.text.Lower('last_name'), name='student_last_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(django.db.models.functions.text.Lower('first_name'), name='student_first_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='student_email_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='profile_thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail names by size, see app.images.'),
+        ),
+    ]
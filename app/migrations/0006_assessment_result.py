@@ -0,0 +1,45 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:27
+
+from django.db import migrations, models
+
+RESULT_TABLES = (
+    ('quiz', 'app_quizresult', 'app_quiz', 'quiz_id'),
+    ('exam', 'app_examresult', 'app_exam', 'exam_id'),
+    ('activity', 'app_activityresult', 'app_activity', 'activity_id'),
+)
+
+CREATE_VIEW = 'CREATE VIEW app_assessmentresult AS\n' + '\nUNION ALL\n'.join(
+    f"SELECT '{kind}-' || r.id AS id, '{kind}' AS assessment_type, r.id AS result_id, "
+    f"a.id AS assessment_id, r.student_id, a.subject_id, a.title, a.total_marks, r.score, r.graded_at "
+    f"FROM {result_table} r INNER JOIN {assessment_table} a ON a.id = r.{column}"
+    for kind, result_table, assessment_table, column in RESULT_TABLES
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_student_profile_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssessmentResult',
+            fields=[
+                ('id', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('assessment_type', models.CharField(choices=[('quiz', 'Quiz'), ('exam', 'Exam'), ('activity', 'Activity')], max_length=10)),
+                ('result_id', models.BigIntegerField()),
+                ('assessment_id', models.BigIntegerField()),
+                ('title', models.CharField(max_length=100)),
+                ('total_marks', models.PositiveIntegerField()),
+                ('score', models.PositiveIntegerField()),
+                ('graded_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'app_assessmentresult',
+                'ordering': ['-graded_at', '-id'],
+                'managed': False,
+            },
+        ),
+        migrations.RunSQL(CREATE_VIEW, 'DROP VIEW app_assessmentresult'),
+    ]
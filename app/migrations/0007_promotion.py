@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_assessment_result'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Promotion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('replaced_subjects', models.BooleanField(default=False)),
+                ('student_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('undone_at', models.DateTimeField(blank=True, null=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='promotions', to='app.course')),
+                ('from_year_level', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='app.yearlevel')),
+                ('section', models.ForeignKey(blank=True, help_text='New section, if the cohort changed section.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='app.section')),
+                ('subjects', models.ManyToManyField(blank=True, help_text="New subject set, if the cohort's enrolments were replaced.", related_name='+', to='app.subject')),
+                ('to_year_level', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='app.yearlevel')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PromotionEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subjects', models.JSONField(blank=True, null=True)),
+                ('promotion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='app.promotion')),
+                ('section', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='app.section')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.student')),
+                ('year_level', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='app.yearlevel')),
+            ],
+            options={
+                'verbose_name_plural': 'Promotion entries',
+            },
+        ),
+    ]
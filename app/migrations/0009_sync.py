@@ -0,0 +1,103 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:54
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# SQLite rebuilds a table to add a column, which fails while a view reads it.
+CREATE_VIEW = import_module('app.migrations.0006_assessment_result').CREATE_VIEW
+DROP_VIEW = 'DROP VIEW app_assessmentresult'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_report_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Model label, e.g. app.student.', max_length=100)),
+                ('object_id', models.CharField(max_length=64)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['deleted_at', 'id'],
+            },
+        ),
+        migrations.RunSQL(DROP_VIEW, CREATE_VIEW),
+        migrations.AddField(
+            model_name='activityresult',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='examresult',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='quizresult',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        # Results never recorded when they last changed; graded_at is the closest known time.
+        migrations.RunSQL(
+            [f'UPDATE {table} SET updated_at = graded_at' for table in (
+                'app_quizresult', 'app_examresult', 'app_activityresult',
+            )],
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(CREATE_VIEW, DROP_VIEW),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['updated_at'], name='app_activit_updated_251a3c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activityresult',
+            index=models.Index(fields=['updated_at'], name='app_activit_updated_e2350c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['updated_at'], name='app_course_updated_3a28dd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['updated_at'], name='app_exam_updated_9fb45c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examresult',
+            index=models.Index(fields=['updated_at'], name='app_examres_updated_68eea9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['updated_at'], name='app_quiz_updated_0495fa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizresult',
+            index=models.Index(fields=['updated_at'], name='app_quizres_updated_d9a823_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='section',
+            index=models.Index(fields=['updated_at'], name='app_section_updated_ece268_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['updated_at'], name='app_student_updated_02a518_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(fields=['updated_at'], name='app_subject_updated_5870ea_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='yearlevel',
+            index=models.Index(fields=['updated_at'], name='app_yearlev_updated_2e2f6b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted_at', 'model'], name='app_tombsto_deleted_2f512d_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:09
+
+import app.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_sync'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportjob',
+            name='file',
+            field=models.FileField(blank=True, editable=False, storage=app.models.ReportStorage(), upload_to='reports/'),
+        ),
+    ]
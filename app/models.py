@@ -1,6 +1,10 @@
+import os
 import uuid
 
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from django.db import models
+from django.db.models.functions import Lower
 
 
 # Utility
@@ -8,6 +12,28 @@ def student_profile_image_path(instance, filename):
     return f'student_profiles/student_{instance.id}/{filename}'
 
 
+def display_relations(model, prefix=''):
+    """
+    Lookup paths for the required foreign keys a model's __str__ walks
+    (e.g. QuizResult -> quiz -> subject -> course), for use with select_related.
+    """
+    paths = []
+    for field in model._meta.concrete_fields:
+        if field.many_to_one and not field.null:
+            path = f'{prefix}{field.name}'
+            paths.append(path)
+            paths.extend(display_relations(field.related_model, f'{path}__'))
+    return paths
+
+
+def assessment_field(result_model):
+    """The foreign key from a *Result model to its assessment (quiz, exam or activity)."""
+    return next(
+        field for field in result_model._meta.concrete_fields
+        if field.many_to_one and field.related_model is not Student
+    )
+
+
 # =========================
 # Core Academic Structures
 # =========================
@@ -22,6 +48,7 @@ class Course(models.Model):
     class Meta:
         verbose_name_plural = "Courses"
         ordering = ['name']
+        indexes = [models.Index(fields=['name', 'id']), models.Index(fields=['updated_at'])]
 
     def __str__(self):
         return f"{self.name} ({self.code})"
@@ -36,6 +63,7 @@ class YearLevel(models.Model):
     class Meta:
         verbose_name_plural = "Year Levels"
         ordering = ['year']
+        indexes = [models.Index(fields=['updated_at'])]
 
     def __str__(self):
         return f"Year {self.year}"
@@ -50,6 +78,7 @@ class Section(models.Model):
     class Meta:
         verbose_name_plural = "Sections"
         ordering = ['section']
+        indexes = [models.Index(fields=['updated_at'])]
 
     def __str__(self):
         return f"Section {self.section}"
@@ -76,6 +105,7 @@ class Subject(models.Model):
         verbose_name_plural = "Subjects"
         unique_together = ('course', 'code')
         ordering = ['name']
+        indexes = [models.Index(fields=['name', 'id']), models.Index(fields=['updated_at'])]
 
     def __str__(self):
         return f"{self.name} ({self.code}) - {self.course.code}"
@@ -96,6 +126,8 @@ class Student(models.Model):
     date_of_birth = models.DateField()
     profile_image = models.ImageField(upload_to=student_profile_image_path, default='default_profile.jpg', blank=True,
                                       null=True)
+    profile_thumbnails = models.JSONField(default=dict, blank=True, editable=False,
+                                          help_text="Generated thumbnail names by size, see app.images.")
     course = models.ForeignKey(Course, on_delete=models.PROTECT, null=True, blank=True, related_name='students')
     year_level = models.ForeignKey(YearLevel, on_delete=models.PROTECT, null=True, blank=True, related_name='students')
     section = models.ForeignKey(Section, on_delete=models.PROTECT, null=True, blank=True, related_name='students')
@@ -105,6 +137,13 @@ class Student(models.Model):
 
     class Meta:
         ordering = ['last_name', 'first_name']
+        indexes = [
+            models.Index(fields=['last_name', 'first_name', 'id']),
+            models.Index(Lower('last_name'), name='student_last_name_lower_idx'),
+            models.Index(Lower('first_name'), name='student_first_name_lower_idx'),
+            models.Index(Lower('email'), name='student_email_lower_idx'),
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self):
         middle = f" {self.middle_name}" if self.middle_name else ""
@@ -125,6 +164,7 @@ class BaseAssessment(models.Model):
 
     class Meta:
         abstract = True
+        indexes = [models.Index(fields=['subject', 'created_at']), models.Index(fields=['updated_at'])]
 
     def clean(self):
         super().clean()
@@ -162,10 +202,16 @@ class QuizResult(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     score = models.PositiveIntegerField()
     graded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('quiz', 'student')
         ordering = ['-graded_at']
+        indexes = [
+            models.Index(fields=['-graded_at', '-id']),
+            models.Index(fields=['student', 'graded_at']),
+            models.Index(fields=['updated_at']),
+        ]
 
     def clean(self):
         if self.score > self.quiz.total_marks:
@@ -180,10 +226,16 @@ class ExamResult(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     score = models.PositiveIntegerField()
     graded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('exam', 'student')
         ordering = ['-graded_at']
+        indexes = [
+            models.Index(fields=['-graded_at', '-id']),
+            models.Index(fields=['student', 'graded_at']),
+            models.Index(fields=['updated_at']),
+        ]
 
     def clean(self):
         if self.score > self.exam.total_marks:
@@ -202,10 +254,16 @@ class ActivityResult(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     score = models.PositiveIntegerField()
     graded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('activity', 'student')
         ordering = ['-graded_at']
+        indexes = [
+            models.Index(fields=['-graded_at', '-id']),
+            models.Index(fields=['student', 'graded_at']),
+            models.Index(fields=['updated_at']),
+        ]
 
     def clean(self):
         if self.score > self.activity.total_marks:
@@ -217,3 +275,216 @@ class ActivityResult(models.Model):
 
     def __str__(self):
         return f"{self.student} - {self.activity.title}: {self.score}"
+
+
+# =========================
+# Grade Summaries
+# =========================
+
+class StudentSubjectGrade(models.Model):
+    """
+    Denormalised per-student totals for one subject and assessment type.
+    Maintained from the result tables by app.grades; never edited directly.
+    """
+    ASSESSMENT_TYPES = [
+        ('quiz', 'Quiz'),
+        ('exam', 'Exam'),
+        ('activity', 'Activity'),
+    ]
+
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='grades')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='grades')
+    assessment_type = models.CharField(max_length=10, choices=ASSESSMENT_TYPES)
+    count = models.PositiveIntegerField(default=0)
+    score_sum = models.PositiveIntegerField(default=0)
+    total_marks_sum = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('student', 'subject', 'assessment_type')
+        ordering = ['student_id', 'subject_id', 'assessment_type']
+        indexes = [models.Index(fields=['subject', 'assessment_type'])]
+
+    @property
+    def percentage(self):
+        if not self.total_marks_sum:
+            return None
+        return round(100 * self.score_sum / self.total_marks_sum, 2)
+
+    def __str__(self):
+        return f"{self.student_id} - {self.subject_id} ({self.assessment_type}): {self.percentage}%"
+
+
+# =========================
+# Promotions
+# =========================
+
+class Promotion(models.Model):
+    """
+    A cohort moved from one year level to the next by app.promotion.promote(),
+    journaled per student in PromotionEntry so it can be undone.
+    """
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='promotions')
+    from_year_level = models.ForeignKey(YearLevel, on_delete=models.PROTECT, related_name='+')
+    to_year_level = models.ForeignKey(YearLevel, on_delete=models.PROTECT, related_name='+')
+    section = models.ForeignKey(Section, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+                                help_text="New section, if the cohort changed section.")
+    subjects = models.ManyToManyField(Subject, blank=True, related_name='+',
+                                      help_text="New subject set, if the cohort's enrolments were replaced.")
+    replaced_subjects = models.BooleanField(default=False)
+    student_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    undone_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+
+    def __str__(self):
+        return f"{self.course_id}: year {self.from_year_level_id} -> {self.to_year_level_id} ({self.student_count})"
+
+
+class PromotionEntry(models.Model):
+    """A promoted student's year level, section and (if replaced) subjects before the promotion."""
+    promotion = models.ForeignKey(Promotion, on_delete=models.CASCADE, related_name='entries')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='+')
+    year_level = models.ForeignKey(YearLevel, on_delete=models.SET_NULL, null=True, related_name='+')
+    section = models.ForeignKey(Section, on_delete=models.SET_NULL, null=True, related_name='+')
+    subjects = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Promotion entries"
+
+    def __str__(self):
+        return f"{self.promotion_id}: {self.student_id}"
+
+
+# =========================
+# Report Cards
+# =========================
+
+class ReportStorage(FileSystemStorage):
+    """
+    Files under REPORT_ROOT, outside MEDIA_ROOT: reports are only served by the
+    permission-checked download action, never as media.
+    """
+
+    @property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.REPORT_ROOT)
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+
+report_storage = ReportStorage()
+
+
+class ReportJob(models.Model):
+    """
+    Report cards for one student, or for every student matching the given
+    course, year level and section, rendered to a PDF by app.reports.
+    """
+    STATUSES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    year_level = models.ForeignKey(YearLevel, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    section = models.ForeignKey(Section, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=10, choices=STATUSES, default='pending')
+    student_count = models.PositiveIntegerField(default=0)
+    file = models.FileField(upload_to='reports/', storage=report_storage, blank=True, editable=False)
+    error = models.TextField(blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+
+    def cohort(self):
+        if self.student_id:
+            return Student.objects.filter(pk=self.student_id)
+        scope = {name: getattr(self, name) for name in ('course', 'year_level', 'section') if getattr(self, name)}
+        return Student.objects.filter(**scope)
+
+    def __str__(self):
+        return f"Report {self.pk} ({self.status})"
+
+
+# =========================
+# Delta Sync
+# =========================
+
+class Tombstone(models.Model):
+    """
+    A deleted row of a synced model, kept for SYNC_TOMBSTONE_RETENTION so that
+    delta sync (app.sync) can tell clients to drop it.
+    """
+    model = models.CharField(max_length=100, help_text="Model label, e.g. app.student.")
+    object_id = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['deleted_at', 'id']
+        indexes = [models.Index(fields=['deleted_at', 'model'])]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted {self.deleted_at}"
+
+
+# =========================
+# Unified Results
+# =========================
+
+class AssessmentResultQuerySet(models.QuerySet):
+
+    def filter(self, *args, **kwargs):
+        # `id` is computed by the view, so `id = 'quiz-12'` would scan every arm.
+        # Filter on the type and the result table's primary key instead.
+        for name in ('pk', 'id'):
+            if name in kwargs:
+                kind, _, result_id = str(kwargs.pop(name)).rpartition('-')
+                kwargs.update(assessment_type=kind, result_id=result_id)
+        return super().filter(*args, **kwargs)
+
+
+class AssessmentResult(models.Model):
+    """
+    Every quiz, exam and activity result in one relation: a database view over
+    the three result tables joined to their assessments (migration 0006).
+    Read-only; results are still written through QuizResult, ExamResult and
+    ActivityResult. `id` is "<assessment_type>-<result id>".
+    """
+    id = models.CharField(primary_key=True, max_length=32)
+    assessment_type = models.CharField(max_length=10, choices=StudentSubjectGrade.ASSESSMENT_TYPES)
+    result_id = models.BigIntegerField()
+    assessment_id = models.BigIntegerField()
+    student = models.ForeignKey(
+        Student, on_delete=models.DO_NOTHING, db_constraint=False, related_name='results'
+    )
+    subject = models.ForeignKey(
+        Subject, on_delete=models.DO_NOTHING, db_constraint=False, related_name='results'
+    )
+    title = models.CharField(max_length=100)
+    total_marks = models.PositiveIntegerField()
+    score = models.PositiveIntegerField()
+    graded_at = models.DateTimeField()
+
+    objects = AssessmentResultQuerySet.as_manager()
+
+    class Meta:
+        managed = False
+        db_table = 'app_assessmentresult'
+        ordering = ['-graded_at', '-id']
+
+    @property
+    def percentage(self):
+        return round(100 * self.score / self.total_marks, 2) if self.total_marks else None
+
+    def __str__(self):
+        return f"{self.student_id} - {self.title} ({self.assessment_type}): {self.score}/{self.total_marks}"
@@ -0,0 +1,162 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+Cursor = namedtuple('Cursor', ['reverse', 'position'])
+
+
+def keyset_ordering(model, ordering):
+    """
+    Normalise an ordering to concrete column names and append the primary key
+    as a tie-breaker, so every row has a unique position in the keyset.
+    """
+    pk_name = model._meta.pk.attname
+    columns = []
+    for term in ordering:
+        if not isinstance(term, str):
+            continue
+        descending = term.startswith('-')
+        name = term.lstrip('-')
+        name = pk_name if name == 'pk' else model._meta.get_field(name).attname
+        columns.append(f"-{name}" if descending else name)
+    if not any(column.lstrip('-') == pk_name for column in columns):
+        descending = bool(columns) and columns[-1].startswith('-')
+        columns.append(f"-{pk_name}" if descending else pk_name)
+    return tuple(columns)
+
+
+def invert_ordering(ordering):
+    return tuple(column[1:] if column.startswith('-') else f"-{column}" for column in ordering)
+
+
+def seek_filter(ordering, position):
+    """
+    Build the row-value comparison `(a, b, ...) > (x, y, ...)` for a mixed
+    direction ordering. The leading `a >= x` term lets the index seek directly
+    to the cursor position instead of scanning from the start.
+    """
+    (column, *rest), (value, *remaining) = ordering, position
+    name, lookup = (column[1:], 'lt') if column.startswith('-') else (column, 'gt')
+    if not rest:
+        return Q(**{f'{name}__{lookup}': value})
+    return Q(**{f'{name}__{lookup}e': value}) & (
+        Q(**{f'{name}__{lookup}': value}) | Q(**{name: value}) & seek_filter(rest, remaining)
+    )
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Seek pagination on the model's `Meta.ordering` (or the ordering already
+    applied to the queryset), with the primary key as a tie-breaker. Each page
+    is a single indexed range scan, so deep pages cost the same as page one.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 500)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset()` evaluating the page with the async ORM."""
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([obj async for obj in queryset])
+
+    def page_queryset(self, queryset, request, view=None):
+        """The unevaluated queryset for the requested page, plus one row to detect a next page."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor is not None and self.cursor.reverse
+        ordering = invert_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(seek_filter(ordering, self.cursor.position))
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        reverse = self.cursor is not None and self.cursor.reverse
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_page_size(self, request):
+        page_size = super().get_page_size(request)
+        if page_size and self.max_page_size:
+            return min(page_size, self.max_page_size)
+        return page_size
+
+    def get_ordering(self, request, queryset, view):
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        self.model = queryset.model
+        return keyset_ordering(queryset.model, ordering)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(reverse=True, position=position))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            values = payload['p']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.model._meta.get_field(column.lstrip('-')).to_python(value)
+                for column, value in zip(self.ordering, values)
+            ]
+        except (KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(reverse=bool(payload.get('r')), position=position)
+
+    def encode_cursor(self, cursor):
+        payload = {'p': cursor.position}
+        if cursor.reverse:
+            payload['r'] = 1
+        encoded = urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position_from_instance(self, instance, ordering):
+        position = []
+        for column in ordering:
+            name = column.lstrip('-')
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            position.append(str(value))
+        return position
@@ -0,0 +1,22 @@
+import codecs
+import csv
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class CSVParser(BaseParser):
+    """Parses a CSV upload with a header row into a list of dicts."""
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if encoding.lower().replace('-', '') == 'utf8':
+            encoding = 'utf-8-sig'
+        try:
+            reader = csv.DictReader(codecs.getreader(encoding)(stream))
+            return [{key.strip(): value.strip() for key, value in row.items() if key} for row in reader]
+        except (csv.Error, UnicodeDecodeError, AttributeError) as exc:
+            raise ParseError(f'CSV parse error - {exc}')
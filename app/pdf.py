@@ -0,0 +1,123 @@
+"""
+Report card PDFs, written directly as PDF text objects in the standard
+Helvetica fonts, so no PDF library is needed.
+
+Nothing here imports Django: render_report_cards() runs in the worker processes
+of app.reports, which receive plain dicts (see app.reports.report_cards) and
+return compressed page content streams for build_pdf() to assemble.
+"""
+import zlib
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 50
+LINE_HEIGHT = 14
+# x positions of the result table columns: type, title, score, percentage, graded.
+COLUMNS = (MARGIN, MARGIN + 60, MARGIN + 290, MARGIN + 360, MARGIN + 420)
+
+
+def _text(value):
+    # Helvetica with WinAnsiEncoding covers cp1252; anything else prints as "?".
+    data = str(value).encode('cp1252', 'replace')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def _percentage(value):
+    return '-' if value is None else f'{value:.2f}%'
+
+
+class _Page:
+
+    def __init__(self):
+        self.commands = []
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def text(self, x, text, size=10, bold=False):
+        font = b'F2' if bold else b'F1'
+        self.commands.append(b'BT /%s %d Tf %d %d Td (%s) Tj ET' % (font, size, x, self.y, _text(text)))
+
+    def rule(self):
+        self.commands.append(b'%d %d m %d %d l S' % (MARGIN, self.y + 4, PAGE_WIDTH - MARGIN, self.y + 4))
+
+    def stream(self):
+        return zlib.compress(b'\n'.join(self.commands))
+
+
+def report_card_pages(card):
+    """Lay out one student's report card, returning a _Page per page it needs."""
+    pages = [_Page()]
+
+    def line(height=LINE_HEIGHT):
+        page = pages[-1]
+        page.y -= height
+        if page.y < MARGIN:
+            pages.append(_Page())
+            pages[-1].text(MARGIN, f"{card['name']} (continued)", bold=True)
+            pages[-1].y -= LINE_HEIGHT * 2
+        return pages[-1]
+
+    page = pages[0]
+    page.text(MARGIN, 'Report card', size=16, bold=True)
+    page = line(LINE_HEIGHT * 2)
+    page.text(MARGIN, card['name'], size=12, bold=True)
+    for label, key in (('Student ID', 'student_id'), ('Email', 'email'), ('Course', 'course'),
+                       ('Year level', 'year_level'), ('Section', 'section')):
+        page = line()
+        page.text(MARGIN, label)
+        page.text(COLUMNS[1] + 20, card[key] if card[key] is not None else '-')
+
+    for subject in card['subjects']:
+        page = line(LINE_HEIGHT * 2)
+        page.text(MARGIN, f"{subject['code']}  {subject['name']}", bold=True)
+        page.text(COLUMNS[3], _percentage(subject['percentage']), bold=True)
+        page = line(4)
+        page.rule()
+        if not subject['results']:
+            page = line()
+            page.text(COLUMNS[1], 'No results yet')
+        for kind, title, score, total_marks, graded_at in subject['results']:
+            page = line()
+            page.text(COLUMNS[0], kind.capitalize())
+            page.text(COLUMNS[1], title[:45])
+            page.text(COLUMNS[2], f'{score}/{total_marks}')
+            page.text(COLUMNS[3], _percentage(100 * score / total_marks if total_marks else None))
+            page.text(COLUMNS[4], graded_at)
+
+    page = line(LINE_HEIGHT * 2)
+    page.text(MARGIN, 'Overall', bold=True)
+    page.text(COLUMNS[3], _percentage(card['overall']), bold=True)
+    return pages
+
+
+def render_report_cards(cards):
+    """Compressed content streams for the pages of every card in `cards`, in order."""
+    return [page.stream() for card in cards for page in report_card_pages(card)]
+
+
+def build_pdf(streams, title='Report cards'):
+    """A complete PDF document with one page per content stream."""
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % (6 + 2 * i) for i in range(len(streams))), len(streams)
+        ),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+        b'<< /Title (%s) >>' % _text(title),
+    ]
+    for i, stream in enumerate(streams):
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R '
+            b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>' % (PAGE_WIDTH, PAGE_HEIGHT, 7 + 2 * i)
+        )
+        objects.append(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream))
+
+    output = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    output += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    output += b'trailer\n<< /Size %d /Root 1 0 R /Info 5 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(output)
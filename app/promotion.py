@@ -0,0 +1,120 @@
+"""
+Set-based cohort promotion.
+
+promote() moves every student in a course and year level up to the next year
+level, optionally into a new section and subject set, with a fixed handful of
+statements: bulk INSERTs journaling each student's previous state, one UPDATE
+of the students, and one DELETE plus a bulk INSERT for the enrolments, all in
+one transaction. undo_promotion() restores the journaled state.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Student, Subject, YearLevel, Promotion, PromotionEntry
+
+
+def next_year_level(year_level):
+    return YearLevel.objects.filter(year__gt=year_level.year).order_by('year').first()
+
+
+def promote(course, year_level, to_year_level=None, section=None, subjects=None, dry_run=False):
+    """
+    Promote the students of `course` in `year_level` to `to_year_level` (by
+    default the next year level up). `section` moves them all to one section;
+    `subjects`, when given, replaces their enrolments.
+
+    Returns `(promotion, summary)`, where `summary` has the number of students
+    promoted and enrolments removed and added. With `dry_run` nothing is
+    written and `promotion` is None.
+    """
+    to_year_level = to_year_level or next_year_level(year_level)
+    if to_year_level is None:
+        raise ValidationError(f'There is no year level after {year_level}.')
+    if to_year_level == year_level:
+        raise ValidationError('The cohort is already in that year level.')
+
+    through = Student.subject.through
+    with transaction.atomic():
+        cohort = Student.objects.select_for_update().filter(course=course, year_level=year_level).order_by()
+        students = list(cohort.values_list('pk', 'section_id'))
+        previous = {}
+        if subjects is not None:
+            for student_id, subject_id in through.objects.filter(
+                student__course=course, student__year_level=year_level
+            ).values_list('student_id', 'subject_id'):
+                previous.setdefault(student_id, []).append(subject_id)
+        summary = {
+            'students': len(students),
+            'from_year_level': year_level.pk,
+            'to_year_level': to_year_level.pk,
+            'unenrolled': sum(map(len, previous.values())),
+            'enrolled': len(students) * len(subjects) if subjects is not None else 0,
+            'dry_run': dry_run,
+        }
+        if dry_run:
+            return None, summary
+
+        promotion = Promotion.objects.create(
+            course=course, from_year_level=year_level, to_year_level=to_year_level, section=section,
+            replaced_subjects=subjects is not None, student_count=len(students),
+        )
+        if subjects:
+            promotion.subjects.set(subjects)
+        PromotionEntry.objects.bulk_create([
+            PromotionEntry(
+                promotion=promotion, student_id=student_id, year_level=year_level, section_id=section_id,
+                subjects=previous.get(student_id, []) if subjects is not None else None,
+            )
+            for student_id, section_id in students
+        ])
+
+        # Touch exactly the journaled students, even if the cohort gained one since.
+        journaled = promotion.entries.values('student_id')
+        changes = {'year_level': to_year_level, 'updated_at': timezone.now(), **({'section': section} if section else {})}
+        Student.objects.filter(pk__in=journaled).update(**changes)
+        if subjects is not None:
+            through.objects.filter(student_id__in=journaled).delete()
+            through.objects.bulk_create([
+                through(student_id=student_id, subject_id=subject.pk) for student_id, _ in students for subject in subjects
+            ])
+    return promotion, summary
+
+
+def undo_promotion(promotion):
+    """
+    Put the students of `promotion` back in their previous year level, and
+    section and subjects if the promotion changed them. Later promotions of the
+    same students must be undone first. Enrolments in subjects deleted since
+    are not restored.
+    """
+    through = Student.subject.through
+    now = timezone.now()
+    with transaction.atomic():
+        # Checked under the row lock, so concurrent undos cannot both restore.
+        promotion = Promotion.objects.select_for_update().get(pk=promotion.pk)
+        if promotion.undone_at is not None:
+            raise ValidationError('This promotion has already been undone.')
+        entries = promotion.entries.all()
+        if Promotion.objects.filter(
+            pk__gt=promotion.pk, undone_at__isnull=True, entries__student__in=entries.values('student_id')
+        ).exists():
+            raise ValidationError('Later promotions of these students must be undone first.')
+
+        restore = ('year_level_id', 'section_id') if promotion.section_id else ('year_level_id',)
+        for values in entries.values(*restore).distinct():
+            Student.objects.filter(pk__in=entries.filter(**values).values('student_id')).update(**values, updated_at=now)
+        if promotion.replaced_subjects:
+            through.objects.filter(student_id__in=entries.values('student_id')).delete()
+            journaled = list(entries.values_list('student_id', 'subjects'))
+            remaining = set(Subject.objects.filter(
+                pk__in={subject_id for _, subjects in journaled for subject_id in subjects}
+            ).values_list('pk', flat=True))
+            through.objects.bulk_create([
+                through(student_id=student_id, subject_id=subject_id)
+                for student_id, subjects in journaled
+                for subject_id in subjects if subject_id in remaining
+            ])
+        promotion.undone_at = now
+        promotion.save(update_fields=['undone_at'])
+    return promotion
@@ -0,0 +1,94 @@
+import csv
+import io
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson would format datetimes itself; pass them to DRF's encoder so output
+# is byte-for-byte what JSONRenderer produces.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+
+def json_dumps(value):
+    """Compact UTF-8 JSON for `value`, with orjson when it is installed and DRF's encoder otherwise."""
+    if orjson is not None:
+        data = orjson.dumps(value, default=JSONEncoder().default, option=ORJSON_OPTIONS)
+        # Like JSONRenderer, escape the two line terminators JavaScript rejects in strings.
+        return data.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    data = json.dumps(value, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':'))
+    return data.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+def _csv_value(value):
+    if isinstance(value, (list, tuple)):
+        return ';'.join(str(item) for item in value)
+    return '' if value is None else value
+
+
+def csv_chunks(rows, fieldnames=None, batch_size=500):
+    """Yield CSV text for an iterable of dicts, a header plus `batch_size` rows at a time."""
+    buffer = io.StringIO()
+    writer = None
+    for count, row in enumerate(rows, 1):
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=fieldnames or list(row), extrasaction='ignore')
+            writer.writeheader()
+        writer.writerow({key: _csv_value(value) for key, value in row.items()})
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(rows, batch_size=500):
+    """Yield newline-delimited JSON bytes for an iterable of dicts, `batch_size` rows at a time."""
+    lines = []
+    for row in rows:
+        lines.append(json_dumps(row))
+        if len(lines) == batch_size:
+            yield b'\n'.join(lines) + b'\n'
+            lines = []
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed (see json_dumps).
+    Indented output, as the browsable API asks for, still uses the stdlib.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return json_dumps(data)
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(csv_chunks(rows)).encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(ndjson_chunks(rows))
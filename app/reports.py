@@ -0,0 +1,144 @@
+"""
+Report card generation.
+
+submit_report() records a ReportJob and, once the transaction commits, hands
+it to a dispatcher thread. The dispatcher reads the whole cohort up front with
+a fixed handful of queries per STUDENT_BATCH_SIZE students (report_cards()),
+then fans the CPU-bound layout and compression out to a process pool in chunks
+of REPORT_CHUNK_SIZE cards (app.pdf) and stores the assembled PDF under
+REPORT_ROOT/reports/. As with thumbnails, jobs still queued when the process
+exits are lost and stay "pending"; submit them again.
+"""
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .grades import STUDENT_BATCH_SIZE
+from .models import Student, Subject, AssessmentResult, ReportJob
+from .pdf import build_pdf, render_report_cards
+
+logger = logging.getLogger(__name__)
+
+_dispatcher = None
+_pool = None
+
+
+def get_dispatcher():
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='reports')
+    return _dispatcher
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        # Forking from the dispatcher thread could copy locks other threads hold
+        # mid-request; spawned workers only import app.pdf.
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.REPORT_WORKERS, mp_context=multiprocessing.get_context('spawn')
+        )
+    return _pool
+
+
+def report_cards(students):
+    """
+    Plain-dict report cards for the `students` queryset: one query each for
+    the students and their subjects, and two per STUDENT_BATCH_SIZE students
+    for results and enrolments.
+    """
+    students = list(students.select_related('course', 'year_level', 'section').order_by(
+        'last_name', 'first_name', 'pk'
+    ))
+    results, enrolled = {}, {}
+    for start in range(0, len(students), STUDENT_BATCH_SIZE):
+        batch = [student.pk for student in students[start:start + STUDENT_BATCH_SIZE]]
+        # Dates are truncated in SQL; converting and localising each datetime dominated the read.
+        for row in AssessmentResult.objects.filter(student_id__in=batch).order_by('graded_at', 'id').values_list(
+            'student_id', 'subject_id', 'assessment_type', 'title', 'score', 'total_marks', TruncDate('graded_at'),
+        ):
+            results.setdefault(row[0], {}).setdefault(row[1], []).append(row[2:])
+        for student_id, subject_id in Student.subject.through.objects.filter(student_id__in=batch).values_list(
+            'student_id', 'subject_id'
+        ):
+            enrolled.setdefault(student_id, set()).add(subject_id)
+    subject_ids = {subject_id for by_subject in results.values() for subject_id in by_subject}
+    subjects = Subject.objects.in_bulk(subject_ids.union(*enrolled.values()))
+
+    cards = []
+    for student in students:
+        by_subject = results.get(student.pk, {})
+        rows = []
+        for subject_id in sorted(enrolled.get(student.pk, set()) | set(by_subject), key=lambda pk: subjects[pk].code):
+            subject_results = by_subject.get(subject_id, [])
+            total_marks = sum(row[3] for row in subject_results)
+            rows.append({
+                'code': subjects[subject_id].code,
+                'name': subjects[subject_id].name,
+                'percentage': 100 * sum(row[2] for row in subject_results) / total_marks if total_marks else None,
+                'results': [
+                    (kind, title, score, marks, graded_on.isoformat())
+                    for kind, title, score, marks, graded_on in subject_results
+                ],
+            })
+        scored = [row['percentage'] for row in rows if row['percentage'] is not None]
+        middle = f' {student.middle_name}' if student.middle_name else ''
+        cards.append({
+            'name': f'{student.first_name}{middle} {student.last_name}',
+            'student_id': student.student_id,
+            'email': student.email,
+            'course': student.course and student.course.name,
+            'year_level': student.year_level and student.year_level.year,
+            'section': student.section and student.section.section,
+            'subjects': rows,
+            'overall': sum(scored) / len(scored) if scored else None,
+        })
+    return cards
+
+
+def generate_report(job_id):
+    """Render the job's report cards and store the PDF, recording the outcome on the job."""
+    job = ReportJob.objects.get(pk=job_id)
+    ReportJob.objects.filter(pk=job_id).update(status='running')
+    try:
+        cards = report_cards(job.cohort())
+        chunk_size = settings.REPORT_CHUNK_SIZE
+        chunks = [cards[start:start + chunk_size] for start in range(0, len(cards), chunk_size)]
+        if settings.REPORT_PROCESSING_ASYNC and len(chunks) > 1:
+            rendered = get_pool().map(render_report_cards, chunks)
+        else:
+            rendered = map(render_report_cards, chunks)
+        streams = [stream for chunk in rendered for stream in chunk]
+        job.file.save(f'report-{job_id}.pdf', ContentFile(build_pdf(streams, title=f'Report cards ({job_id})')),
+                      save=False)
+    except Exception as exc:
+        logger.exception('Report %s failed', job_id)
+        ReportJob.objects.filter(pk=job_id).update(status='failed', error=str(exc), finished_at=timezone.now())
+        return
+    ReportJob.objects.filter(pk=job_id).update(
+        status='done', file=job.file.name, student_count=len(cards), finished_at=timezone.now()
+    )
+
+
+def generate_in_worker(job_id):
+    # The dispatcher thread outlives requests, so release its connection after each job.
+    try:
+        generate_report(job_id)
+    finally:
+        connection.close()
+
+
+def submit_report(**scope):
+    """Create a ReportJob for `scope` (student, or course/year_level/section) and queue it after commit."""
+    job = ReportJob.objects.create(**scope)
+    if settings.REPORT_PROCESSING_ASYNC:
+        transaction.on_commit(lambda: get_dispatcher().submit(generate_in_worker, job.pk))
+    else:
+        transaction.on_commit(lambda: generate_report(job.pk))
+    return job
@@ -1,19 +1,211 @@
-from rest_framework import serializers
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.fields.files import FileField
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.reverse import reverse
+from rest_framework.settings import api_settings
+
+from StudentManagementSystem.profiling import timed_serializer
 
 from .models import (
     Student, Course, YearLevel, Section, Subject,
     Quiz, Exam, Activity,
-    QuizResult, ExamResult, ActivityResult
+    QuizResult, ExamResult, ActivityResult, StudentSubjectGrade, AssessmentResult, Promotion, ReportJob,
+    display_relations
 )
 
 
-def create_serializer(model_class):
+class DisplayRelatedField(serializers.PrimaryKeyRelatedField):
+    """Joins what the related model's __str__ needs, so rendered choices don't query per option."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        relations = display_relations(queryset.model)
+        return queryset.select_related(*relations) if relations else queryset
+
+
+class ProfiledModelSerializer(serializers.ModelSerializer):
+    """
+    Reports time spent building representations to the request profiler, when
+    enabled. Pass `fields=[...]` to serialize only those fields (sparse fieldsets).
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def to_representation(self, instance):
+        with timed_serializer():
+            return super().to_representation(instance)
+
+
+class ThumbnailsField(serializers.ReadOnlyField):
+    """Renders stored thumbnail names as {size: absolute URL}."""
+
+    def to_representation(self, value):
+        storage = Student._meta.get_field('profile_image').storage
+        request = self.context.get('request')
+        urls = {}
+        for size, name in (value or {}).items():
+            if size == 'source':
+                continue
+            url = storage.url(name)
+            urls[size] = request.build_absolute_uri(url) if request is not None else url
+        return urls
+
+
+class ReportDownloadField(serializers.ReadOnlyField):
+    """Renders a report job's file as the URL of its download action, the only place it is served."""
+
+    def __init__(self, **kwargs):
+        super().__init__(source='*', **kwargs)
+
+    def to_representation(self, job):
+        if not job.file:
+            return None
+        return reverse('reportjob-download', args=[job.pk], request=self.context.get('request'))
+
+
+# Fields whose to_representation() returns database values unchanged.
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField)
+
+
+def _file_url(field, model_field, context):
+    storage = model_field.storage
+    request = context.get('request')
+    use_url = getattr(field, 'use_url', True)
+    urls = {}
+
+    def to_representation(name):
+        if not name:
+            return None
+        if not use_url:
+            return name
+        if name not in urls:
+            url = storage.url(name)
+            urls[name] = request.build_absolute_uri(url) if request is not None else url
+        return urls[name]
+    return to_representation
+
+
+def _iso_datetime(field):
+    # DateTimeField.to_representation() looks up the current timezone on every call.
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if field_timezone is None or output_format is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+
+    def to_representation(value):
+        if timezone.is_naive(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return to_representation
+
+
+class ValuesRepresentation:
+    """
+    Builds a serializer's output straight from `QuerySet.values()` rows: no model
+    instances, no per-row attribute lookups through field sources, and plain
+    database values passed through untouched. Many-to-many id lists are fetched
+    with one query per relation per batch. Use `for_serializer()`, which returns
+    None for serializers with fields this can't reproduce exactly.
+    """
+
+    def __init__(self, model, fields):
+        self.pk_name = model._meta.pk.attname
+        # (output name, values() column or None for many-to-many, converter or model field)
+        self.fields = fields
+
+    @classmethod
+    def for_serializer(cls, serializer):
+        model = serializer.Meta.model
+        fields = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+            if isinstance(field, serializers.ManyRelatedField):
+                child = field.child_relation
+                if not (model_field.many_to_many and model_field.concrete) or not (
+                    isinstance(child, serializers.PrimaryKeyRelatedField) and child.pk_field is None
+                ):
+                    return None
+                fields.append((name, None, model_field))
+                continue
+            if model_field.is_relation:
+                if not (model_field.many_to_one or model_field.one_to_one) or not (
+                    isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None
+                ):
+                    return None
+                convert = None
+            elif isinstance(model_field, FileField) and isinstance(field, serializers.FileField):
+                convert = _file_url(field, model_field, serializer.context)
+            elif type(field) is serializers.DateTimeField:
+                convert = _iso_datetime(field)
+            else:
+                convert = None if type(field) in PASSTHROUGH_FIELDS else field.to_representation
+            fields.append((name, model_field.attname, convert))
+        return cls(model, fields)
+
+    @property
+    def many_related(self):
+        return any(column is None for _, column, _ in self.fields)
+
+    def values(self, queryset, *extra_columns):
+        columns = [column for _, column, _ in self.fields if column is not None]
+        return queryset.prefetch_related(None).values(*dict.fromkeys((self.pk_name, *columns, *extra_columns)))
+
+    def represent(self, rows):
+        """Representations for a batch of rows from `values()`."""
+        related = {}
+        for name, column, model_field in self.fields:
+            if column is not None:
+                continue
+            query_name = model_field.related_query_name()
+            related[name] = ids = {}
+            for pk, related_pk in model_field.related_model.objects.filter(
+                **{f'{query_name}__in': [row[self.pk_name] for row in rows]}
+            ).values_list(query_name, 'pk'):
+                ids.setdefault(pk, []).append(related_pk)
+
+        data = []
+        with timed_serializer():
+            for row in rows:
+                item = {}
+                for name, column, convert in self.fields:
+                    if column is None:
+                        item[name] = related[name].get(row[self.pk_name], [])
+                        continue
+                    value = row[column]
+                    item[name] = value if convert is None or value is None else convert(value)
+                data.append(item)
+        return data
+
+    def iterate(self, queryset, chunk_size=2000):
+        """Representations for every row of `queryset`, read in chunks with constant memory."""
+        rows = self.values(queryset).iterator(chunk_size=chunk_size)
+        while batch := list(islice(rows, chunk_size)):
+            yield from self.represent(batch)
+
+
+def create_serializer(model_class, **declared_fields):
     serializer_name = f"{model_class.__name__}Serializer"
 
     serializer_class = type(
         serializer_name,
-        (serializers.ModelSerializer,),
+        (ProfiledModelSerializer,),
         {
+            "serializer_related_field": DisplayRelatedField,
+            **declared_fields,
             "Meta": type("Meta", (), {
                 "model": model_class,
                 "fields": "__all__"
@@ -23,7 +215,7 @@ def create_serializer(model_class):
     return serializer_class
 
 
-StudentSerializer = create_serializer(Student)
+StudentSerializer = create_serializer(Student, profile_thumbnails=ThumbnailsField())
 CourseSerializer = create_serializer(Course)
 YearLevelSerializer = create_serializer(YearLevel)
 SectionSerializer = create_serializer(Section)
@@ -34,3 +226,64 @@ ActivitySerializer = create_serializer(Activity)
 QuizResultSerializer = create_serializer(QuizResult)
 ExamResultSerializer = create_serializer(ExamResult)
 ActivityResultSerializer = create_serializer(ActivityResult)
+AssessmentResultSerializer = create_serializer(AssessmentResult)
+PromotionSerializer = create_serializer(Promotion)
+
+
+class PromotionRequestSerializer(serializers.Serializer):
+    """Arguments for app.promotion.promote()."""
+    course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all())
+    year_level = serializers.PrimaryKeyRelatedField(queryset=YearLevel.objects.all())
+    to_year_level = serializers.PrimaryKeyRelatedField(queryset=YearLevel.objects.all(), required=False)
+    section = serializers.PrimaryKeyRelatedField(queryset=Section.objects.all(), required=False)
+    subjects = serializers.PrimaryKeyRelatedField(queryset=Subject.objects.all(), many=True, required=False)
+
+    def validate(self, attrs):
+        # Year levels and sections are shared by every course; subjects belong to one.
+        foreign = [subject.pk for subject in attrs.get('subjects', []) if subject.course_id != attrs['course'].pk]
+        if foreign:
+            raise serializers.ValidationError({'subjects': f'Subjects {foreign} are not taught in this course.'})
+        return attrs
+
+
+ReportJobSerializer = create_serializer(ReportJob, file=ReportDownloadField())
+
+
+class ReportRequestSerializer(serializers.Serializer):
+    """Arguments for app.reports.submit_report(): a student, or any of course, year level and section."""
+    student = serializers.PrimaryKeyRelatedField(queryset=Student.objects.all(), required=False)
+    course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all(), required=False)
+    year_level = serializers.PrimaryKeyRelatedField(queryset=YearLevel.objects.all(), required=False)
+    section = serializers.PrimaryKeyRelatedField(queryset=Section.objects.all(), required=False)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError('Give a student, or a course, year level or section.')
+        if 'student' in attrs and len(attrs) > 1:
+            raise serializers.ValidationError('A student report cannot also be scoped by course, year level or section.')
+        return attrs
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    method = serializers.CharField(default='GET')
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False, allow_null=True)
+
+    def validate_method(self, value):
+        if value.upper() not in ('GET', 'POST', 'PUT', 'PATCH', 'DELETE'):
+            raise serializers.ValidationError(f'Unsupported method "{value}".')
+        return value.upper()
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    """Arguments for app.batch.run_batch()."""
+    operations = BatchOperationSerializer(many=True, allow_empty=False, max_length=settings.API_BATCH_MAX_OPERATIONS)
+    atomic = serializers.BooleanField(default=False)
+
+
+class StudentSubjectGradeSerializer(ProfiledModelSerializer):
+    percentage = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = StudentSubjectGrade
+        fields = '__all__'
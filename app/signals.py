@@ -0,0 +1,92 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import CACHED_MODELS, invalidate_model
+from .grades import RESULT_MODELS, refresh_grades
+from .images import schedule_thumbnails
+from .models import Student, Quiz, Exam, Activity, assessment_field
+from .stats import invalidate_assessments
+from .sync import SYNC_MODELS, record_deletion
+
+
+# Foreign keys a save can move a row away from, leaving the old side's grades and statistics stale.
+MOVABLE_FIELDS = {
+    **{model: (assessment_field(model).attname, 'student_id') for model in RESULT_MODELS},
+    Quiz: ('subject_id',), Exam: ('subject_id',), Activity: ('subject_id',),
+}
+
+
+def _remember_moved_from(sender, instance, update_fields=None, **kwargs):
+    fields = MOVABLE_FIELDS[sender]
+    if instance._state.adding:
+        return
+    if update_fields is not None and not any(f in update_fields or f.removesuffix('_id') in update_fields for f in fields):
+        return
+    instance._moved_from = sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+for _movable_model in MOVABLE_FIELDS:
+    pre_save.connect(_remember_moved_from, sender=_movable_model, dispatch_uid=f'moves_{_movable_model.__name__}')
+
+
+def _refresh_result(sender, instance, **kwargs):
+    assessment = assessment_field(sender)
+    current = {'student_id': instance.student_id, assessment.attname: getattr(instance, assessment.attname)}
+    previous = instance.__dict__.pop('_moved_from', None) or current
+    refresh_grades(sender, [current['student_id'], previous['student_id']])
+    invalidate_assessments(assessment.related_model, [current[assessment.attname], previous[assessment.attname]])
+
+
+for _result_model in RESULT_MODELS:
+    post_save.connect(_refresh_result, sender=_result_model, dispatch_uid=f'grades_{_result_model.__name__}_save')
+    post_delete.connect(_refresh_result, sender=_result_model, dispatch_uid=f'grades_{_result_model.__name__}_delete')
+
+
+@receiver(post_save, sender=Quiz, dispatch_uid='grades_quiz_save')
+@receiver(post_save, sender=Exam, dispatch_uid='grades_exam_save')
+@receiver(post_save, sender=Activity, dispatch_uid='grades_activity_save')
+def refresh_assessment(sender, instance, created, **kwargs):
+    """`total_marks` or `subject` may have changed, which moves every result of the assessment."""
+    previous = instance.__dict__.pop('_moved_from', None)
+    if created:
+        return
+    results = getattr(instance, f'{sender._meta.model_name}result_set')
+    refresh_grades(results.model, results.values_list('student_id', flat=True))
+    invalidate_assessments(sender, [instance.pk], subject_ids=[previous['subject_id']] if previous else ())
+
+
+def _invalidate_responses(sender, **kwargs):
+    invalidate_model(sender)
+
+
+for _cached_model in CACHED_MODELS:
+    post_save.connect(_invalidate_responses, sender=_cached_model, dispatch_uid=f'cache_{_cached_model.__name__}_save')
+    post_delete.connect(_invalidate_responses, sender=_cached_model, dispatch_uid=f'cache_{_cached_model.__name__}_delete')
+
+
+@receiver(post_save, sender=Student, dispatch_uid='thumbnails_student_save')
+def queue_thumbnails(sender, instance, **kwargs):
+    schedule_thumbnails(instance)
+
+
+def _record_deletion(sender, instance, **kwargs):
+    record_deletion(instance)
+
+
+for _synced_model in SYNC_MODELS:
+    post_delete.connect(_record_deletion, sender=_synced_model, dispatch_uid=f'sync_{_synced_model.__name__}_delete')
+
+
+@receiver(m2m_changed, sender=Student.subject.through, dispatch_uid='sync_student_subject_m2m')
+def touch_enrolled_students(sender, instance, action, reverse, pk_set, **kwargs):
+    """A student's subject list is part of the student, so changing it bumps updated_at for delta sync."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        students = Student.objects.filter(pk=instance.pk)
+    elif action == 'pre_clear':
+        students = instance.students.all()
+    else:
+        students = Student.objects.filter(pk__in=pk_set)
+    students.update(updated_at=timezone.now())
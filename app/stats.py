@@ -0,0 +1,134 @@
+"""
+Class statistics: score summaries, ranks and percentiles for an assessment or
+a whole subject.
+
+Ranks and percentiles come from RANK() and PERCENT_RANK() window functions, so
+each ranking is a single query however large the class is; the summaries are
+computed from the same fetched score arrays. Results are cached per assessment
+and per subject until a result in them changes (see app.signals).
+"""
+import statistics
+
+from django.conf import settings
+from django.db.models import F, FloatField, Sum, Window
+from django.db.models.functions import Cast, PercentRank, Rank
+
+from .cache import cache_enabled, get_cache, statistics_cache_key, invalidate_statistics
+from .models import Subject, AssessmentResult, StudentSubjectGrade
+
+
+def summarize(values):
+    """Count, mean, median, population standard deviation, min and max of `values`."""
+    if not values:
+        return {'count': 0, 'mean': None, 'median': None, 'stdev': None, 'min': None, 'max': None}
+    return {
+        'count': len(values),
+        'mean': round(statistics.fmean(values), 2),
+        'median': round(statistics.median(values), 2),
+        'stdev': round(statistics.pstdev(values), 2),
+        'min': min(values),
+        'max': max(values),
+    }
+
+
+def _ranked(queryset, value):
+    """`queryset` annotated with the rank (1 = best) and percentile (100 = best) of `value`."""
+    return queryset.annotate(
+        rank=Window(Rank(), order_by=value.desc()),
+        percent_rank=Window(PercentRank(), order_by=value.asc()),
+    ).order_by('rank', 'student_id')
+
+
+def _rankings(rows, value_name):
+    return {
+        'student': [row['student_id'] for row in rows],
+        value_name: [row[value_name] for row in rows],
+        'rank': [row['rank'] for row in rows],
+        'percentile': [round(100 * row['percent_rank'], 2) for row in rows],
+    }
+
+
+def assessment_statistics(assessment):
+    """Score summary plus every student's rank and percentile on one quiz, exam or activity."""
+    kind = assessment._meta.model_name
+    rows = list(_ranked(
+        AssessmentResult.objects.filter(assessment_type=kind, assessment_id=assessment.pk),
+        F('score'),
+    ).values('student_id', 'score', 'rank', 'percent_rank'))
+    scores = [row['score'] for row in rows]
+    summary = summarize(scores)
+    summary['mean_percentage'] = (
+        round(100 * summary['mean'] / assessment.total_marks, 2) if scores and assessment.total_marks else None
+    )
+    return {
+        'assessment': {
+            'type': kind,
+            'id': assessment.pk,
+            'title': assessment.title,
+            'subject': assessment.subject_id,
+            'total_marks': assessment.total_marks,
+        },
+        'summary': summary,
+        'rankings': _rankings(rows, 'score'),
+    }
+
+
+def subject_statistics(subject):
+    """
+    Students ranked by their overall percentage in `subject` (from the grade
+    summaries), with a summary of those percentages and of every assessment.
+    """
+    percentage = Cast(Sum('score_sum'), FloatField()) * 100 / Sum('total_marks_sum')
+    rows = list(_ranked(
+        StudentSubjectGrade.objects.filter(subject=subject, total_marks_sum__gt=0).values('student_id'),
+        percentage,
+    ).annotate(percentage=percentage).values('student_id', 'percentage', 'rank', 'percent_rank'))
+    for row in rows:
+        row['percentage'] = round(row['percentage'], 2)
+
+    assessments = {}
+    for kind, assessment_id, title, total_marks, score in AssessmentResult.objects.filter(
+        subject=subject
+    ).order_by('assessment_type', 'assessment_id').values_list(
+        'assessment_type', 'assessment_id', 'title', 'total_marks', 'score',
+    ):
+        assessments.setdefault((kind, assessment_id, title, total_marks), []).append(score)
+    summaries = [summarize(scores) for scores in assessments.values()]
+
+    return {
+        'subject': {'id': subject.pk, 'name': subject.name, 'code': subject.code},
+        'summary': summarize([row['percentage'] for row in rows]),
+        'assessments': {
+            'type': [kind for kind, _, _, _ in assessments],
+            'id': [assessment_id for _, assessment_id, _, _ in assessments],
+            'title': [title for _, _, title, _ in assessments],
+            'total_marks': [total_marks for _, _, _, total_marks in assessments],
+            **{name: [summary[name] for summary in summaries] for name in summarize([0])},
+        },
+        'rankings': _rankings(rows, 'percentage'),
+    }
+
+
+def cached_statistics(instance):
+    """Statistics for a Subject or an assessment, from the cache when its results haven't changed."""
+    if not cache_enabled():
+        return subject_statistics(instance) if isinstance(instance, Subject) else assessment_statistics(instance)
+    cache = get_cache()
+    key = statistics_cache_key(type(instance), instance.pk)
+    data = cache.get(key)
+    if data is None:
+        data = subject_statistics(instance) if isinstance(instance, Subject) else assessment_statistics(instance)
+        cache.set(key, data, settings.API_RESPONSE_CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_assessments(assessment_model, assessment_ids, subject_ids=()):
+    """Retire cached statistics of the given assessments, of their subjects and of `subject_ids`."""
+    assessment_ids = set(assessment_ids)
+    for assessment_id in assessment_ids:
+        invalidate_statistics(assessment_model, assessment_id)
+    subject_ids = {
+        *subject_ids, *assessment_model.objects.filter(pk__in=assessment_ids).values_list('subject_id', flat=True)
+    }
+    for subject_id in subject_ids:
+        invalidate_statistics(Subject, subject_id)
@@ -0,0 +1,163 @@
+"""
+Delta sync for offline-capable clients.
+
+`GET /api/sync/` returns every synced row, and a token; passing the token back
+as `?since=` returns only what was created, updated or deleted after it.
+Changes are read through each model's `updated_at` index and deletions from
+the Tombstone table, which post_delete fills (see app.signals).
+
+A response holds at most SYNC_PAGE_SIZE rows. When there are more, it says
+`"more": true` and its token continues from the last row sent, as (model,
+updated_at, pk); the client passes it back until `"more"` is false, and the
+last page's token is the one to keep for the next sync.
+
+A token is a signed timestamp taken before reading. A transaction that commits
+late can carry an earlier `updated_at`, so changes from SYNC_OVERLAP seconds
+before the token are sent again and clients must apply them idempotently.
+Tombstones are pruned after SYNC_TOMBSTONE_RETENTION (`manage.py
+prune_tombstones`); older tokens are refused and the client syncs from scratch.
+"""
+import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+
+from .grades import RESULT_MODELS
+from .models import (
+    Course, YearLevel, Section, Subject, Student, Quiz, Exam, Activity, QuizResult, ExamResult, ActivityResult,
+    Tombstone,
+)
+from .serializers import ValuesRepresentation
+
+SYNC_MODELS = (Course, YearLevel, Section, Subject, Student, Quiz, Exam, Activity, QuizResult, ExamResult, ActivityResult)
+TOKEN_SALT = 'app.sync'
+
+
+class TokenExpired(Exception):
+    pass
+
+
+def make_token(when):
+    return signing.dumps(when.timestamp(), salt=TOKEN_SALT)
+
+
+def make_continuation(since, started, prefixes, after):
+    """A token for the page after the row `after` = (model label, updated_at, pk) of a sync begun at `started`."""
+    label, updated_at, pk = after
+    return signing.dumps({
+        'since': since and since.timestamp(), 'started': started.timestamp(), 'prefixes': prefixes,
+        'after': [label, updated_at.isoformat(), str(pk)],
+    }, salt=TOKEN_SALT)
+
+
+def _datetime(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+
+
+def read_token(token):
+    """
+    The sync state in `token`, as (since, started, prefixes, after); all but
+    `since` are None unless it continues a paged sync. Raises BadSignature for
+    a forged or mangled token, TokenExpired for an old one.
+    """
+    state = signing.loads(token, salt=TOKEN_SALT)
+    if not isinstance(state, dict):
+        state = {'since': state}
+    since = state['since'] and _datetime(state['since'])
+    if since and since < timezone.now() - settings.SYNC_TOMBSTONE_RETENTION:
+        raise TokenExpired
+    if 'after' not in state:
+        return since, None, None, None
+    return since, _datetime(state['started']), state['prefixes'], state['after']
+
+
+def record_deletion(instance):
+    Tombstone.objects.create(model=instance._meta.label_lower, object_id=str(instance.pk))
+
+
+def prune_tombstones():
+    """Delete tombstones older than any token still accepted. Returns how many were deleted."""
+    return Tombstone.objects.filter(deleted_at__lt=timezone.now() - settings.SYNC_TOMBSTONE_RETENTION).delete()[0]
+
+
+def _rows(viewset, queryset, created_column, context):
+    """(representation, (created time, updated time, pk)) for every row of `queryset`."""
+    serializer_class = viewset.serializer_class
+    representation = ValuesRepresentation.for_serializer(serializer_class(context=context))
+    if representation is not None:
+        rows = list(representation.values(queryset, created_column, 'updated_at'))
+        keys = [(row[created_column], row['updated_at'], row[representation.pk_name]) for row in rows]
+        return zip(representation.represent(rows), keys)
+    instances = list(queryset)
+    data = serializer_class(instances, many=True, context=context).data
+    return zip(data, [(getattr(instance, created_column), instance.updated_at, instance.pk) for instance in instances])
+
+
+def changes(since=None, prefixes=None, context=None):
+    """
+    Changes to the synced models since the `since` token (everything without
+    one), keyed by router prefix and limited to `prefixes` if given, one page
+    of SYNC_PAGE_SIZE rows at a time: `{'token': ..., 'more': bool,
+    'changes': {prefix: {'created': [...], 'updated': [...], 'deleted': [ids]}}}`.
+    Prefixes without changes are left out. A continuation token keeps the
+    prefixes of the first page.
+    """
+    # urls imports the views, which import this module.
+    from .urls import router
+
+    context = {} if context is None else context
+    since, started, continued_prefixes, after = read_token(since) if since else (None, None, None, None)
+    if after is not None:
+        prefixes = continued_prefixes
+    # The final token is the start of the first page: rows changed while paging are sent again next time.
+    started = started or timezone.now()
+    cutoff = since - datetime.timedelta(seconds=settings.SYNC_OVERLAP) if since else None
+    synced = {
+        viewset.queryset.model: (prefix, viewset) for prefix, viewset, _ in router.registry
+        if viewset.queryset.model in SYNC_MODELS and (prefixes is None or prefix in prefixes)
+    }
+    deleted = {}
+    if cutoff is not None and after is None:
+        labels = {model._meta.label_lower: model for model in synced}
+        for label, object_id in Tombstone.objects.filter(deleted_at__gte=cutoff, model__in=labels).values_list(
+            'model', 'object_id'
+        ):
+            deleted.setdefault(labels[label], []).append(labels[label]._meta.pk.to_python(object_id))
+
+    result = {}
+    remaining, more = settings.SYNC_PAGE_SIZE, False
+    # Models come in registry order; a continuation skips those before its row's model.
+    skipping = after is not None
+    for model, (prefix, viewset) in synced.items():
+        label = model._meta.label_lower
+        queryset = viewset.queryset.order_by('updated_at', 'pk')
+        if cutoff is not None:
+            queryset = queryset.filter(updated_at__gte=cutoff)
+        if skipping:
+            if label != after[0]:
+                continue
+            skipping = False
+            updated_at, pk = datetime.datetime.fromisoformat(after[1]), model._meta.pk.to_python(after[2])
+            queryset = queryset.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, pk__gt=pk))
+        created_column = 'graded_at' if model in RESULT_MODELS else 'created_at'
+        entry = {'created': [], 'updated': [], 'deleted': deleted.get(model, [])}
+        # One row past the page tells whether there is another page.
+        rows = list(_rows(viewset, queryset[:remaining + 1], created_column, context))
+        if len(rows) > remaining:
+            rows, more = rows[:remaining], True
+        for data, (created_at, updated_at, pk) in rows:
+            entry['created' if cutoff is None or created_at >= cutoff else 'updated'].append(data)
+            after = (label, updated_at, pk)
+        remaining -= len(rows)
+        if any(entry.values()):
+            result[prefix] = entry
+        if more:
+            break
+    # Every deletion comes on the first page, also for models the page did not reach.
+    for model, ids in deleted.items():
+        result.setdefault(synced[model][0], {'created': [], 'updated': [], 'deleted': ids})
+    if more:
+        return {'token': make_continuation(since, started, prefixes, after), 'more': True, 'changes': result}
+    return {'token': make_token(started), 'more': False, 'changes': result}
@@ -0,0 +1,155 @@
+"""
+Synthetic data for benchmarks and load tests.
+
+Everything is written with bulk_create in fixed-size batches, so generating
+hundreds of thousands of results keeps memory flat and takes seconds.
+"""
+import datetime
+import random
+import uuid
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Max
+
+from .grades import rebuild_grades
+from .models import (
+    Student, Course, YearLevel, Section, Subject,
+    Quiz, Exam, Activity,
+    QuizResult, ExamResult, ActivityResult, assessment_field
+)
+
+FIRST_NAMES = (
+    'James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'William', 'Elizabeth',
+    'David', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Charles', 'Karen',
+    'Miguel', 'Sofia', 'Jose', 'Maria', 'Juan', 'Ana', 'Carlos', 'Angela', 'Mark', 'Andrea',
+)
+LAST_NAMES = (
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+    'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin',
+    'Santos', 'Reyes', 'Cruz', 'Bautista', 'Ocampo', 'Garcia', 'Mendoza', 'Torres', 'Flores', 'Villanueva',
+)
+SUBJECT_NAMES = (
+    'Mathematics', 'Physics', 'Chemistry', 'Biology', 'Literature', 'History', 'Programming', 'Statistics',
+    'Economics', 'Philosophy', 'Databases', 'Networks', 'Algorithms', 'Ethics', 'Accounting', 'Design',
+)
+
+BATCH_SIZE = 5000
+
+
+@dataclass
+class Scale:
+    courses: int = 2
+    subjects_per_course: int = 4
+    year_levels: int = 4
+    sections: int = 4
+    students: int = 500
+    assessments_per_subject: int = 3
+
+
+SCALES = {
+    'tiny': Scale(courses=1, subjects_per_course=2, students=50, assessments_per_subject=2),
+    'small': Scale(),
+    'medium': Scale(courses=4, subjects_per_course=6, students=5000, assessments_per_subject=3),
+    'large': Scale(courses=8, subjects_per_course=8, students=20000, assessments_per_subject=4),
+}
+
+
+def _batched(rows, model):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def generate(scale, seed=0):
+    """
+    Populate the app tables at `scale`: courses with subjects, year levels and
+    sections, students spread across them and enrolled in their course's
+    subjects, quizzes/exams/activities per subject, and a result for every
+    enrolled student on every assessment. Returns row counts per model.
+    """
+    rng = random.Random(seed)
+    prefix = f'S{seed}'
+
+    with transaction.atomic():
+        courses = Course.objects.bulk_create(
+            Course(name=f'Course {prefix}-{i}', code=f'{prefix}C{i}') for i in range(scale.courses)
+        )
+        first_year = (YearLevel.objects.order_by('-year').values_list('year', flat=True).first() or 0) + 1
+        year_levels = YearLevel.objects.bulk_create(
+            YearLevel(year=first_year + i) for i in range(scale.year_levels)
+        )
+        sections = Section.objects.bulk_create(
+            Section(section=f'{prefix}-{i + 1}') for i in range(scale.sections)
+        )
+        subjects = Subject.objects.bulk_create(
+            Subject(course=course, name=f'{SUBJECT_NAMES[i % len(SUBJECT_NAMES)]} {course.code}', code=f'SUB{i}')
+            for course in courses for i in range(scale.subjects_per_course)
+        )
+        subjects_by_course = {}
+        for subject in subjects:
+            subjects_by_course.setdefault(subject.course_id, []).append(subject)
+
+        first_student_id = (Student.objects.aggregate(Max('student_id'))['student_id__max'] or 0) + 1
+        students = []
+        for i in range(scale.students):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            students.append(Student(
+                id=uuid.UUID(int=rng.getrandbits(128), version=4),
+                student_id=first_student_id + i,
+                first_name=first,
+                last_name=last,
+                email=f'{first}.{last}.{prefix}.{i}@example.edu'.lower(),
+                date_of_birth=datetime.date(1998, 1, 1) + datetime.timedelta(days=rng.randrange(3650)),
+                course=rng.choice(courses),
+                year_level=rng.choice(year_levels),
+                section=rng.choice(sections),
+            ))
+        _batched(students, Student)
+
+        Enrolment = Student.subject.through
+        _batched((
+            Enrolment(student_id=student.pk, subject_id=subject.pk)
+            for student in students for subject in subjects_by_course[student.course_id]
+        ), Enrolment)
+
+        assessments = {}
+        kinds = ((Quiz, QuizResult, 20), (Exam, ExamResult, 100), (Activity, ActivityResult, 50))
+        for model, result_model, marks in kinds:
+            created = model.objects.bulk_create(
+                model(subject=subject, title=f'{model.__name__} {i + 1}', total_marks=marks)
+                for subject in subjects for i in range(scale.assessments_per_subject)
+            )
+            assessments[result_model] = created
+
+        counts = {
+            'course': len(courses), 'yearlevel': len(year_levels), 'section': len(sections),
+            'subject': len(subjects), 'student': len(students),
+        }
+        for result_model, created in assessments.items():
+            by_subject = {}
+            for assessment in created:
+                by_subject.setdefault(assessment.subject_id, []).append(assessment)
+            kind = assessment_field(result_model).attname
+            rows = (
+                result_model(**{
+                    kind: assessment.pk,
+                    'student_id': student.pk,
+                    'score': rng.randint(assessment.total_marks // 3, assessment.total_marks),
+                })
+                for student in students
+                for subject in subjects_by_course[student.course_id]
+                for assessment in by_subject[subject.pk]
+            )
+            _batched(rows, result_model)
+            counts[result_model._meta.model_name] = result_model.objects.filter(
+                **{f'{kind}__in': [assessment.pk for assessment in created]}
+            ).count()
+
+        counts['studentsubjectgrade'] = rebuild_grades()
+    return counts
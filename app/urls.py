@@ -1,6 +1,10 @@
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
 from .views import (
+    async_read_view,
+    batch,
+    sync,
     StudentViewSet,
     CourseViewSet,
     YearLevelViewSet,
@@ -12,6 +16,10 @@ from .views import (
     QuizResultViewSet,
     ExamResultViewSet,
     ActivityResultViewSet,
+    AssessmentResultViewSet,
+    PromotionViewSet,
+    ReportJobViewSet,
+    StudentSubjectGradeViewSet,
 )
 
 router = DefaultRouter()
@@ -26,7 +34,36 @@ router.register(r'activities', ActivityViewSet)
 router.register(r'quiz-results', QuizResultViewSet)
 router.register(r'exam-results', ExamResultViewSet)
 router.register(r'activity-results', ActivityResultViewSet)
+router.register(r'results', AssessmentResultViewSet)
+router.register(r'grades', StudentSubjectGradeViewSet)
+router.register(r'promotions', PromotionViewSet)
+router.register(r'reports', ReportJobViewSet)
+
+# Routes whose list and retrieve GETs are served by async views under ASGI.
+ASYNC_READ_PREFIXES = ('students', 'quiz-results', 'exam-results', 'activity-results', 'results')
+
+
+def async_read_urls(router, prefixes):
+    patterns = []
+    for prefix, viewset, basename in router.registry:
+        if prefix not in prefixes:
+            continue
+        lookup = router.get_lookup_regex(viewset)
+        routes = (
+            (False, rf'^{prefix}/$', {'get': 'list', 'post': 'create'}),
+            (True, rf'^{prefix}/{lookup}/$', {
+                'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy',
+            }),
+        )
+        for detail, regex, actions in routes:
+            name = f"{basename}-{'detail' if detail else 'list'}"
+            patterns.append(re_path(regex, async_read_view(viewset, actions, basename, detail), name=name))
+    return patterns
+
 
 urlpatterns = [
+    *(async_read_urls(router, ASYNC_READ_PREFIXES) if settings.ASYNC_READ_VIEWS else ()),
+    path('batch/', batch, name='batch'),
+    path('sync/', sync, name='sync'),
     path('', include(router.urls)),
 ]
@@ -1,39 +1,472 @@
+import hashlib
 from typing import Type
 
-from django.db.models import Model
-from rest_framework import viewsets
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Model, Prefetch, Sum
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.functional import cached_property
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, serializers, status, viewsets
+from rest_framework.decorators import action, api_view
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .batch import run_batch
+from .bulk import import_roster, ingest_results
+from .cache import cache_enabled, get_cache, response_cache_key
+from .filters import field_lookups, ordering_fields, scope_lookups
+from .grades import gradebook
 
 from .models import (
     Student, Course, YearLevel, Section, Subject,
     Quiz, Exam, Activity,
-    QuizResult, ExamResult, ActivityResult
+    QuizResult, ExamResult, ActivityResult, StudentSubjectGrade, AssessmentResult, Promotion, ReportJob
 )
+from .parsers import CSVParser
+from .promotion import promote, undo_promotion
+from .reports import submit_report
+from .renderers import CSVRenderer, NDJSONRenderer, csv_chunks, ndjson_chunks
+from .stats import cached_statistics
+from .sync import TokenExpired, changes
 from .serializers import (
     StudentSerializer, CourseSerializer, YearLevelSerializer,
     SectionSerializer, SubjectSerializer, QuizSerializer, ExamSerializer,
-    ActivitySerializer, QuizResultSerializer, ExamResultSerializer, ActivityResultSerializer
+    ActivitySerializer, QuizResultSerializer, ExamResultSerializer, ActivityResultSerializer,
+    AssessmentResultSerializer, StudentSubjectGradeSerializer, PromotionSerializer, PromotionRequestSerializer,
+    ReportJobSerializer, ReportRequestSerializer, BatchRequestSerializer, ValuesRepresentation
 )
 
 
-def create_viewset(model_class: Type[Model], serializer_class):
+def optimize_queryset(queryset, serializer_class, fields=None):
+    """
+    Shape a queryset to what `serializer_class` actually reads, so listing N rows
+    costs a fixed number of queries:
+    - many-to-many fields are prefetched in one query per relation,
+    - foreign keys rendered beyond their primary key are joined with select_related,
+    - columns the serializer never reads are deferred with only().
+    With a sparse fieldset in `fields`, relations outside it are not loaded at all.
+    """
+    model = queryset.model
+    select, prefetch, columns = [], [], {model._meta.pk.attname}
+    defer = fields is None
+    for name, field in serializer_class().fields.items():
+        if field.write_only or field.source == '*' or (fields is not None and name not in fields):
+            continue
+        source = field.source.split('.')[0]
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            defer = False
+            continue
+        if isinstance(field, serializers.ManyRelatedField):
+            related = model_field.related_model
+            prefetch.append(Prefetch(source, queryset=related.objects.only(related._meta.pk.attname)))
+        elif model_field.many_to_one or model_field.one_to_one:
+            columns.add(model_field.attname)
+            if not (isinstance(field, serializers.PrimaryKeyRelatedField) and field.use_pk_only_optimization()):
+                select.append(source)
+        elif model_field.concrete:
+            columns.add(model_field.attname)
+
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if defer and not select and len(columns) < len(model._meta.concrete_fields):
+        queryset = queryset.only(*columns)
+    return queryset
+
+
+class SparseFieldsMixin:
+    """
+    `?fields=a,b` on reads returns only those fields, and skips the joins and
+    prefetches the other fields would need.
+    """
+
+    @cached_property
+    def requested_fields(self):
+        raw = self.request.query_params.get('fields') if self.request.method in SAFE_METHODS else None
+        if not raw:
+            return None
+        fields = [name.strip() for name in raw.split(',') if name.strip()]
+        readable = {name for name, field in self.get_serializer_class()().fields.items() if not field.write_only}
+        unknown = sorted(set(fields) - readable)
+        if unknown:
+            raise exceptions.ValidationError({'fields': [f"Unknown field '{name}'." for name in unknown]})
+        return fields
+
+    def get_queryset(self):
+        if self.requested_fields is None:
+            return super().get_queryset()
+        return optimize_queryset(self.queryset.model.objects.all(), self.get_serializer_class(), self.requested_fields)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.requested_fields is not None:
+            kwargs.setdefault('fields', self.requested_fields)
+        return super().get_serializer(*args, **kwargs)
+
+
+class ValuesListMixin:
+    """
+    Builds JSON list pages from `values()` rows (see ValuesRepresentation) when
+    the serializer allows it, instead of model instances and per-row serializers.
+    """
+
+    def list(self, request, *args, **kwargs):
+        representation = self.get_values_representation()
+        if representation is None:
+            return super().list(request, *args, **kwargs)
+        rows = self.paginate_queryset(self.values_queryset(representation))
+        return self.get_paginated_response(representation.represent(rows))
+
+    def get_values_representation(self):
+        if self.paginator is None or self.request.accepted_renderer.format != 'json':
+            return None
+        return ValuesRepresentation.for_serializer(self.get_serializer())
+
+    def values_queryset(self, representation):
+        # Rows must carry the ordering columns the paginator builds cursors from.
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = self.paginator.get_ordering(self.request, queryset, self)
+        return representation.values(queryset, *(column.lstrip('-') for column in ordering))
+
+
+class GradebookMixin:
+    """Adds `GET subjects/{id}/gradebook/[?percentages=true]`, see app.grades.gradebook()."""
+
+    @action(detail=True)
+    def gradebook(self, request, *args, **kwargs):
+        percentages = request.query_params.get('percentages', '').lower() in ('1', 'true', 'yes')
+        return Response(gradebook(self.get_object(), percentages=percentages))
+
+
+class StatisticsMixin:
+    """Adds `GET <prefix>/{id}/statistics/`: ranks, percentiles and score summaries, see app.stats."""
+
+    @action(detail=True)
+    def statistics(self, request, *args, **kwargs):
+        return Response(cached_statistics(self.get_object()))
+
+
+class BulkResultMixin:
+    """Adds `POST <prefix>/bulk/` taking a JSON array or CSV of result rows."""
+
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, CSVParser])
+    def bulk(self, request):
+        if not isinstance(request.data, list):
+            return Response({'detail': 'Expected a list of rows.'}, status=status.HTTP_400_BAD_REQUEST)
+        count, errors = ingest_results(self.queryset.model, request.data)
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'count': count}, status=status.HTTP_200_OK)
+
+
+class RosterImportMixin:
+    """
+    Adds `POST <prefix>/import/[?dry_run=true]` taking a JSON array or CSV of
+    roster rows, see app.bulk.import_roster().
+    """
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[JSONParser, CSVParser])
+    def import_roster(self, request):
+        if not isinstance(request.data, list):
+            return Response({'detail': 'Expected a list of rows.'}, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        summary, errors = import_roster(request.data, dry_run=dry_run)
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary, status=status.HTTP_200_OK)
+
+
+class PromotionMixin:
+    """
+    `POST promotions/[?dry_run=true]` promotes a cohort and `POST promotions/{id}/undo/`
+    reverts it, see app.promotion.
+    """
+
+    def create(self, request, *args, **kwargs):
+        params = PromotionRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        try:
+            promotion, summary = promote(**params.validated_data, dry_run=dry_run)
+        except ValidationError as exc:
+            return Response({'detail': exc.messages}, status=status.HTTP_400_BAD_REQUEST)
+        if promotion is None:
+            return Response(summary, status=status.HTTP_200_OK)
+        return Response({'id': promotion.pk, **summary}, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'])
+    def undo(self, request, *args, **kwargs):
+        try:
+            promotion = undo_promotion(self.get_object())
+        except ValidationError as exc:
+            return Response({'detail': exc.messages}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(promotion).data)
+
+
+class ReportJobMixin:
+    """
+    `POST reports/` queues report cards for a student or cohort (see app.reports),
+    `GET reports/{id}/` is its status and `GET reports/{id}/download/` the PDF.
+    """
+
+    def create(self, request, *args, **kwargs):
+        params = ReportRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        job = submit_report(**params.validated_data)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True)
+    def download(self, request, *args, **kwargs):
+        job = self.get_object()
+        if job.status != 'done':
+            return Response({'detail': f'The report is {job.status}.'}, status=status.HTTP_409_CONFLICT)
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=f'report-{job.pk}.pdf',
+                            content_type='application/pdf')
+
+
+class ExportMixin:
+    """
+    Adds `GET <prefix>/export/?format=csv|ndjson`, narrowed by the same filters as
+    the list endpoint. Rows are streamed from a chunked iterator, so memory stays
+    flat however large the export is.
+    """
+    export_chunk_size = 2000
+
+    @action(detail=False, renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        representation = ValuesRepresentation.for_serializer(serializer)
+        if representation is not None:
+            rows = representation.iterate(queryset, chunk_size=self.export_chunk_size)
+        else:
+            rows = (serializer.to_representation(obj) for obj in queryset.iterator(chunk_size=self.export_chunk_size))
+
+        renderer = request.accepted_renderer
+        if renderer.format == 'csv':
+            fieldnames = [name for name, field in serializer.fields.items() if not field.write_only]
+            chunks = csv_chunks(rows, fieldnames=fieldnames)
+        else:
+            chunks = ndjson_chunks(rows)
+        response = StreamingHttpResponse(chunks, content_type=f'{renderer.media_type}; charset={renderer.charset}')
+        response['Content-Disposition'] = f'attachment; filename="{self.basename}.{renderer.format}"'
+        return response
+
+
+class CachedResponseMixin:
+    """
+    Serves list and retrieve JSON responses from the response cache, with an
+    ETag so clients can revalidate with If-None-Match and get a 304. Entries
+    are retired by the model's save/delete signals (see app.signals).
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        # The browsable API embeds the user and CSRF token, so only JSON is shared.
+        if request.accepted_renderer.format != 'json' or not cache_enabled():
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = response_cache_key(self.queryset.model, request)
+        cached = cache.get(key)
+        if cached is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            etag = f'"{hashlib.md5(response.content).hexdigest()}"'
+            cached = (etag, response['Content-Type'], response.content)
+            cache.set(key, cached, settings.API_RESPONSE_CACHE_TIMEOUT)
+
+        etag, content_type, content = cached
+        response = get_conditional_response(request._request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+
+def create_viewset(model_class: Type[Model], serializer_class, *bases, **attrs):
     return type(
         f'{model_class.__name__}ViewSet',
-        (viewsets.ModelViewSet,),
+        (*bases, SparseFieldsMixin, ValuesListMixin, viewsets.ModelViewSet),
         {
-            'queryset': model_class.objects.all(),  # type: ignore[attr-defined]
+            'queryset': optimize_queryset(model_class.objects.all(), serializer_class),  # type: ignore[attr-defined]
             'serializer_class': serializer_class,
+            'filter_lookups': {**field_lookups(model_class), **scope_lookups(model_class)},
+            'ordering_fields': ordering_fields(model_class),
+            **attrs,
         }
     )
 
 
-StudentViewSet = create_viewset(Student, StudentSerializer)
-CourseViewSet = create_viewset(Course, CourseSerializer)
-YearLevelViewSet = create_viewset(YearLevel, YearLevelSerializer)
-SectionViewSet = create_viewset(Section, SectionSerializer)
-SubjectViewSet = create_viewset(Subject, SubjectSerializer)
-QuizViewSet = create_viewset(Quiz, QuizSerializer)
-ExamViewSet = create_viewset(Exam, ExamSerializer)
-ActivityViewSet = create_viewset(Activity, ActivitySerializer)
-QuizResultViewSet = create_viewset(QuizResult, QuizResultSerializer)
-ExamResultViewSet = create_viewset(ExamResult, ExamResultSerializer)
-ActivityResultViewSet = create_viewset(ActivityResult, ActivityResultSerializer)
+StudentViewSet = create_viewset(
+    Student, StudentSerializer, ExportMixin, RosterImportMixin, search_fields=('last_name', 'first_name', 'email')
+)
+CourseViewSet = create_viewset(Course, CourseSerializer, CachedResponseMixin)
+YearLevelViewSet = create_viewset(YearLevel, YearLevelSerializer, CachedResponseMixin)
+SectionViewSet = create_viewset(Section, SectionSerializer, CachedResponseMixin)
+SubjectViewSet = create_viewset(Subject, SubjectSerializer, CachedResponseMixin, GradebookMixin, StatisticsMixin)
+QuizViewSet = create_viewset(Quiz, QuizSerializer, StatisticsMixin)
+ExamViewSet = create_viewset(Exam, ExamSerializer, StatisticsMixin)
+ActivityViewSet = create_viewset(Activity, ActivitySerializer, StatisticsMixin)
+QuizResultViewSet = create_viewset(QuizResult, QuizResultSerializer, BulkResultMixin, ExportMixin)
+ExamResultViewSet = create_viewset(ExamResult, ExamResultSerializer, BulkResultMixin, ExportMixin)
+ActivityResultViewSet = create_viewset(ActivityResult, ActivityResultSerializer, BulkResultMixin, ExportMixin)
+PromotionViewSet = create_viewset(
+    Promotion, PromotionSerializer, PromotionMixin, http_method_names=['get', 'post', 'head', 'options']
+)
+ReportJobViewSet = create_viewset(
+    ReportJob, ReportJobSerializer, ReportJobMixin, http_method_names=['get', 'post', 'head', 'options']
+)
+# Read-only: the view is written through the three result endpoints above.
+AssessmentResultViewSet = create_viewset(
+    AssessmentResult, AssessmentResultSerializer, ExportMixin, http_method_names=['get', 'head', 'options']
+)
+
+
+class StudentSubjectGradeViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Pre-aggregated grades, one row per student, subject and assessment type.
+    Filter with `?student=`, `?subject=` and `?assessment_type=`.
+    """
+    queryset = StudentSubjectGrade.objects.all()
+    serializer_class = StudentSubjectGradeSerializer
+    filter_lookups = {'student': 'student', 'subject': 'subject', 'assessment_type': 'assessment_type'}
+    ordering_fields = ()
+
+    @action(detail=False)
+    def summary(self, request):
+        """Totals across all assessment types, one row per student and subject."""
+        if not {'student', 'subject'} & set(request.query_params):
+            return Response({'detail': 'Filter by student or subject.'}, status=status.HTTP_400_BAD_REQUEST)
+        rows = self.filter_queryset(self.get_queryset()).values('student', 'subject').annotate(
+            result_count=Sum('count'), score_total=Sum('score_sum'), marks_total=Sum('total_marks_sum'),
+        ).order_by('student_id', 'subject_id')
+        return Response([
+            {
+                'student': row['student'],
+                'subject': row['subject'],
+                'count': row['result_count'],
+                'score_sum': row['score_total'],
+                'total_marks_sum': row['marks_total'],
+                'percentage': round(100 * row['score_total'] / row['marks_total'], 2) if row['marks_total'] else None,
+            }
+            for row in rows
+        ])
+
+
+async def _alist(viewset, request):
+    representation = viewset.get_values_representation()
+    if representation is not None:
+        rows = await viewset.paginator.apaginate_queryset(viewset.values_queryset(representation), request, viewset)
+        if representation.many_related:
+            return viewset.get_paginated_response(await sync_to_async(representation.represent)(rows))
+        return viewset.get_paginated_response(representation.represent(rows))
+
+    queryset = viewset.filter_queryset(viewset.get_queryset())
+    page = await viewset.paginator.apaginate_queryset(queryset, request, view=viewset)
+    if page is not None:
+        return viewset.get_paginated_response(viewset.get_serializer(page, many=True).data)
+    return Response(viewset.get_serializer([obj async for obj in queryset], many=True).data)
+
+
+async def _aretrieve(viewset, request):
+    queryset = viewset.filter_queryset(viewset.get_queryset())
+    lookup_url_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
+    try:
+        instance = await queryset.aget(**{viewset.lookup_field: viewset.kwargs[lookup_url_kwarg]})
+    except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+        raise Http404
+    viewset.check_object_permissions(request, instance)
+    return Response(viewset.get_serializer(instance).data)
+
+
+@api_view(['POST'])
+def batch(request):
+    """
+    `POST batch/` runs a list of API operations in one request and returns
+    their results in order, see app.batch.
+    """
+    params = BatchRequestSerializer(data=request.data)
+    params.is_valid(raise_exception=True)
+    return Response({'results': run_batch(request, **params.validated_data)})
+
+
+@api_view(['GET'])
+def sync(request):
+    """
+    `GET sync/[?since=<token>][&models=students,courses]` returns the rows
+    created, updated and deleted since the token, a page at a time, see app.sync.
+    """
+    models = request.query_params.get('models')
+    try:
+        return Response(changes(
+            since=request.query_params.get('since'), prefixes=models.split(',') if models else None,
+            context={'request': request},
+        ))
+    except signing.BadSignature:
+        return Response({'detail': 'Invalid sync token.'}, status=status.HTTP_400_BAD_REQUEST)
+    except TokenExpired:
+        return Response({'detail': 'The sync token has expired; sync again without one.'}, status=status.HTTP_410_GONE)
+
+
+def async_read_view(viewset_class, actions, basename, detail):
+    """
+    An async view for a viewset's list or retrieve route, used under ASGI (see
+    ASYNC_READ_VIEWS). JSON GETs keep the viewset's filtering, pagination and
+    serializers but evaluate their queries with the async ORM, so the event loop
+    serves other requests while one waits on the database. Every other method,
+    and the browsable API, goes to the regular sync viewset in a thread.
+    """
+    sync_view = sync_to_async(viewset_class.as_view(actions, basename=basename, detail=detail))
+    handler = _aretrieve if detail else _alist
+
+    async def view(request, *args, **kwargs):
+        if request.method != 'GET':
+            return await sync_view(request, *args, **kwargs)
+
+        viewset = viewset_class(action_map=actions, basename=basename, detail=detail)
+        viewset.args, viewset.kwargs = args, kwargs
+        viewset.format_kwarg = viewset.get_format_suffix(**kwargs)
+        drf_request = viewset.initialize_request(request, *args, **kwargs)
+        try:
+            renderer, _ = viewset.perform_content_negotiation(drf_request)
+        except exceptions.NotAcceptable:
+            renderer = None
+        if renderer is None or renderer.format != 'json':
+            return await sync_view(request, *args, **kwargs)
+
+        viewset.request = drf_request
+        viewset.headers = viewset.default_response_headers
+        try:
+            # Authentication may load the user, so it runs with the sync checks.
+            await sync_to_async(viewset.initial)(drf_request, *args, **kwargs)
+            response = await handler(viewset, drf_request)
+        except Exception as exc:
+            response = viewset.handle_exception(exc)
+        response = viewset.finalize_response(drf_request, response, *args, **kwargs)
+        # Rendered here, Django would otherwise hop to a thread to render it.
+        response.render()
+        return HttpResponse(response.content, status=response.status_code, headers=response.headers)
+
+    view.initkwargs = {'basename': basename}
+    view.actions = actions
+    return csrf_exempt(view)
+